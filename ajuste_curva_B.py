@@ -9,10 +9,28 @@ import matplotlib
 matplotlib.use('Agg')  # Backend sin GUI
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
+from modelo_armonico import (ajustar_modelo_armonico, evaluar_modelo_armonico, amplitudes_fases,
+                             omega_espectral)
+from catalogo_corridas import (abrir_catalogo, datos_archivo, buscar_corrida,
+                               registrar_corridas, actualizar_modelo, texto_modelo,
+                               leer_modelo, Cronometro)
+from diezmado import diezmar_intervalo, factor_automatico, armonicos_conservados
+
+archivo_datos = 'datafinal.txt'
+t_inicio, t_fin = 3.0, 4.0
+
+# Diezmado opcional antes del ajuste (filtro antialiasing + 1 de cada N muestras,
+# solo sobre el intervalo de ajuste): 1 = sin diezmado, 'auto' = conserva hasta
+# el 3er armónico de la rotación y cubre el intervalo completo, o un entero
+factor_diezmado = 1
+K_max_armonico = 8   # armónicos ofrecidos al ajuste multiarmónico (sin diezmado)
+
+crono = Cronometro()
 
 # Leer datos del archivo
 print("Cargando datos experimentales...")
-data = np.loadtxt('datafinal.txt', skiprows=7, delimiter='\t')
+with crono.etapa('carga'):
+    data = np.loadtxt(archivo_datos, skiprows=7, delimiter='\t')
 
 # Extraer columnas
 t_all = data[:, 0]      # Tiempo en segundos
@@ -20,10 +38,45 @@ B_all = data[:, 1]      # Campo magnético en mT
 
 # Filtrar datos entre 3 y 4 segundos
 print("Filtrando datos entre 3.0 y 4.0 segundos...")
-mask = (t_all >= 3.0) & (t_all <= 4.0)
+mask = (t_all >= t_inicio) & (t_all <= t_fin)
 t_exp = t_all[mask]
 B_exp = B_all[mask]
 
+# Consultar primero el catálogo: mismo archivo (hash), intervalo y diezmado.
+# Si la corrida ya está catalogada se omiten el diezmado y los dos ajustes.
+catalogo = abrir_catalogo()
+origen = datos_archivo(archivo_datos)
+
+if factor_diezmado != 1:
+    with crono.etapa('diezmado'):
+        fs = 1 / (t_all[1] - t_all[0])
+        # Frecuencia de rotación aproximada: pico del espectro del intervalo
+        f_pico = omega_espectral(t_exp, B_exp) / (2 * np.pi)
+        if factor_diezmado == 'auto':
+            factor_diezmado = factor_automatico(fs, 3 * f_pico, n_intervalo=len(t_exp) - 1)
+        # Solo se ajustan los armónicos que el diezmado conserva sin alias
+        K_conservados = armonicos_conservados(fs, factor_diezmado, f_pico)
+        if K_conservados < 1:
+            raise ValueError(f"El diezmado por {factor_diezmado} (Nyquist = "
+                             f"{fs / (2 * factor_diezmado):.1f} Hz) no conserva la "
+                             f"rotación de {f_pico:.2f} Hz; use un factor menor")
+        K_max_armonico = min(K_max_armonico, K_conservados)
+
+registro = buscar_corrida(catalogo, 'ajuste_curva_B', origen['hash_archivo'],
+                          t_inicio, t_fin, factor_diezmado)
+modelo_guardado = leer_modelo(registro)
+
+if factor_diezmado != 1:
+    if registro is None:
+        # Se filtra solo el intervalo más el semiancho del filtro a cada lado
+        with crono.etapa('diezmado'):
+            t_exp, B_exp = diezmar_intervalo(t_all, B_all, factor_diezmado, t_inicio, t_fin)
+        print(f"Diezmado por {factor_diezmado}: {len(t_exp)} puntos, "
+              f"fs = {fs / factor_diezmado:.1f} Hz, hasta {K_max_armonico} armónico(s)")
+    else:
+        print(f"Diezmado por {factor_diezmado} omitido: el ajuste está en el catálogo "
+              f"(las gráficas muestran las muestras originales)")
+
 # Definir la función de ajuste: B_fit = A*sin(B*t + C) + D
 def modelo_senoidal(t, A, B, C, D):
     """
@@ -67,19 +120,30 @@ print("\nRealizando ajuste de curva...")
 parametros_iniciales = [A_inicial, B_inicial, C_inicial, D_inicial]
 
 try:
-    # Ajustar la curva
-    parametros_optimos, covarianza = curve_fit(
-        modelo_senoidal,
-        t_exp,
-        B_exp,
-        p0=parametros_iniciales,
-        maxfev=10000
-    )
+    if registro is not None:
+        print(f"✓ Ajuste recuperado del catálogo (analizado el {registro['fecha_analisis']})")
+        parametros_optimos = np.array([registro['A'], registro['omega'], registro['C'], registro['D']])
+        errores = np.array([registro['error_A'], registro['error_omega'],
+                            registro['error_C'], registro['error_D']])
+    else:
+        # Ajustar la curva
+        with crono.etapa('ajuste'):
+            parametros_optimos, covarianza = curve_fit(
+                modelo_senoidal,
+                t_exp,
+                B_exp,
+                p0=parametros_iniciales,
+                maxfev=10000
+            )
+
+        # Calcular errores de los parámetros
+        errores = np.sqrt(np.diag(covarianza))
 
     A_opt, B_opt, C_opt, D_opt = parametros_optimos
 
-    # Calcular errores de los parámetros
-    errores = np.sqrt(np.diag(covarianza))
+    # A·sin(B·t + C) = (-A)·sin(B·t + C + π): se reporta siempre A > 0
+    if A_opt < 0:
+        A_opt, C_opt = -A_opt, (C_opt + np.pi) % (2 * np.pi)
 
     print("\n" + "="*70)
     print("RESULTADOS DEL AJUSTE DE CURVA")
@@ -117,6 +181,34 @@ try:
     print(f"  Error RMS                = {np.sqrt(np.mean(residuos**2)):.6f} mT")
     print("="*70)
 
+    # Ajuste multiarmónico con la misma frecuencia fundamental
+    # B_fit(t) = D + Σ_k A_k·sin(k·ω·t + C_k), K elegido por BIC
+    if modelo_guardado is not None:
+        print("\nAjuste multiarmónico recuperado del catálogo")
+        ajuste_armonico = modelo_guardado
+    else:
+        print("\nRealizando ajuste multiarmónico (K elegido por BIC)...")
+        with crono.etapa('ajuste_armonico'):
+            ajuste_armonico = ajustar_modelo_armonico(t_exp, B_exp, B_opt, K_max=K_max_armonico)
+    K_arm = ajuste_armonico['K']
+    omega_arm = ajuste_armonico['omega']
+    D_arm, A_k, C_k = amplitudes_fases(ajuste_armonico['coef'])
+    B_fit_arm = evaluar_modelo_armonico(t_exp, omega_arm, ajuste_armonico['coef'])
+    residuos_arm = B_exp - B_fit_arm
+
+    print(f"\nCriterio BIC por número de armónicos:")
+    for K_i, bic_i in ajuste_armonico['tabla_criterio'].items():
+        marca = '  ←' if K_i == K_arm else ''
+        print(f"  K = {K_i}: BIC = {bic_i:.2f}{marca}")
+    print(f"\nModelo con K = {K_arm} armónico(s):")
+    print(f"  ω                  = {omega_arm:.6f} ± {ajuste_armonico['errores'][0]:.6f} rad/s")
+    print(f"  D (Offset)         = {D_arm:.6f} mT")
+    for k in range(K_arm):
+        print(f"  A_{k+1} = {A_k[k]:.6f} mT,  C_{k+1} = {C_k[k]:.6f} rad")
+    print(f"  R² (coef. determinación) = {ajuste_armonico['R2']:.6f}")
+    print(f"  Error RMS                = {ajuste_armonico['rms']:.6f} mT")
+    print("="*70)
+
     # Crear la gráfica
     print("\nGenerando gráfica con ajuste...")
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
@@ -149,6 +241,9 @@ try:
     ax2.plot(t_exp, residuos, 'g.', markersize=2, alpha=0.6, label='Residuos')
     ax2.axhline(y=0, color='k', linestyle='-', linewidth=1)
     ax2.fill_between(t_exp, residuos, alpha=0.3, color='green')
+    if K_arm > 1:
+        ax2.plot(t_exp, residuos_arm, 'm.', markersize=2, alpha=0.6,
+                 label=f'Residuos modelo con K = {K_arm} armónicos')
     ax2.set_xlabel('Tiempo (s)', fontsize=13, fontweight='bold')
     ax2.set_ylabel('Residuos (mT)', fontsize=13, fontweight='bold')
     ax2.set_title('Residuos del Ajuste: $B_{exp} - B_{fit}$',
@@ -200,6 +295,31 @@ try:
     plt.savefig(nombre_archivo2, dpi=300, bbox_inches='tight')
     print(f"✓ Gráfica simple guardada como '{nombre_archivo2}'")
 
+    # Registrar la corrida en el catálogo (si no venía de él); a una corrida
+    # catalogada antes de guardar modelos se le agrega el multiarmónico
+    modelo = texto_modelo(omega_arm, ajuste_armonico['coef'], K=K_arm,
+                          errores=ajuste_armonico['errores'], R2=ajuste_armonico['R2'],
+                          rms=ajuste_armonico['rms'],
+                          tabla_criterio=ajuste_armonico['tabla_criterio'])
+    if registro is not None and modelo_guardado is None:
+        actualizar_modelo(catalogo, registro['id'], modelo)
+        print(f"✓ Modelo multiarmónico agregado a la corrida catalogada")
+    elif registro is None:
+        registrar_corridas(catalogo, [{
+            **origen,
+            'script': 'ajuste_curva_B',
+            't_inicio': t_inicio, 't_fin': t_fin, 'n_puntos': len(t_exp),
+            'factor_diezmado': factor_diezmado,
+            'A': A_opt, 'error_A': errores[0],
+            'omega': B_opt, 'error_omega': errores[1],
+            'C': C_opt, 'error_C': errores[2],
+            'D': D_opt, 'error_D': errores[3],
+            'R2': R_cuadrado, 'K_armonicos': K_arm,
+            'modelo': modelo,
+            'tiempos': crono.tiempos,
+        }])
+        print(f"✓ Resultados registrados en el catálogo de corridas")
+
     print("\n✓ Proceso completado exitosamente\n")
 
 except Exception as e:
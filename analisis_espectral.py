@@ -0,0 +1,146 @@
+"""
+Script para caracterizar el ruido de los sensores de Campo Magnético y Corriente
+Densidad espectral de potencia por el método de Welch: piso de ruido, SNR en la
+frecuencia de rotación, armónicos y componentes de la red eléctrica (50/60 Hz)
+Laboratorio de Física - FEM
+"""
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend sin GUI
+import matplotlib.pyplot as plt
+from itertools import chain
+
+from datos_vernier import leer_series_vernier, leer_vernier_por_bloques
+from espectro_ruido import psd_welch_streaming, psd_welch_lote, caracterizar_canal, frecuencia_pico
+from modelo_armonico import ajustar_modelo_armonico, omega_espectral
+
+# ============================================================================
+# PARÁMETROS
+# ============================================================================
+
+archivo = 'datafinal.txt'
+archivos_lote = ['datafinal.txt', 'lab_data.txt']
+
+nperseg = 1024                  # muestras por segmento (~1 Hz de resolución a 1 kHz)
+solape = 0.5
+canales = [('B', 'mT'), ('I', 'A')]
+
+print("="*70)
+print("ANÁLISIS ESPECTRAL Y PISO DE RUIDO DE LOS SENSORES")
+print("="*70)
+print(f"\n  Segmento de Welch:      {nperseg} muestras, solape {solape*100:.0f}%")
+
+# ============================================================================
+# PSD DEL REGISTRO COMPLETO (LECTURA POR BLOQUES)
+# ============================================================================
+
+print(f"\nCalculando PSD de '{archivo}' por bloques...")
+bloques = leer_vernier_por_bloques(archivo)
+primer_bloque = next(bloques)
+fs = 1 / (primer_bloque[1, 0] - primer_bloque[0, 0])
+
+f, psd, n_segmentos = psd_welch_streaming(
+    (b[:, 1:].T for b in chain([primer_bloque], bloques)),
+    fs, nperseg, solape
+)
+print(f"✓ {n_segmentos} segmentos promediados, fs = {fs:.1f} Hz, Δf = {f[1]:.4f} Hz")
+
+# Frecuencia de rotación: línea más intensa de la PSD de B (sin leer el registro completo)
+f_rotacion = frecuencia_pico(f, psd[0])
+print(f"  Frecuencia de rotación (pico de la PSD de B): {f_rotacion:.3f} Hz")
+
+resultados = {}
+for c, (nombre, unidad) in enumerate(canales):
+    r = caracterizar_canal(f, psd[c], f_rotacion)
+    resultados[nombre] = r
+
+    print(f"\nCanal {nombre}:")
+    print(f"  Piso de ruido:         {r['densidad_ruido']:.3e} {unidad}/√Hz")
+    print(f"  Ruido RMS (0-{f[-1]:.0f} Hz): {r['ruido_rms']:.3e} {unidad}")
+    print(f"  SNR en f_rotación:     {r['snr_dB']:.2f} dB")
+    print(f"  Armónicos de rotación:")
+    for a in r['armonicos']:
+        print(f"    k = {a['k']}  f = {a['f']:7.2f} Hz  P = {a['potencia']:.3e} {unidad}²")
+    print(f"  Componentes de red (prominencia > 6 dB sobre el piso):")
+    lineas_red = [x for x in r['red'] if x['prominencia_dB'] > 6]
+    if not lineas_red:
+        print(f"    ninguna")
+    for x in lineas_red:
+        print(f"    {x['h']}×{x['f_red']:.0f} Hz  f = {x['f']:7.2f} Hz  "
+              f"P = {x['potencia']:.3e} {unidad}²  ({x['prominencia_dB']:+.1f} dB)")
+
+# ============================================================================
+# COMPARACIÓN ENTRE CORRIDAS (UNA SOLA rFFT PARA TODAS)
+# ============================================================================
+
+# Cada corrida con su propia fs y su propia frecuencia de rotación: pico del
+# espectro de B refinado con el ajuste senoidal (un armónico) de la corrida
+corridas = []
+for ruta in archivos_lote:
+    for serie in leer_series_vernier(ruta):
+        t, B = serie['datos'][:, 0], serie['datos'][:, 1]
+        fs_corrida = (len(t) - 1) / (t[-1] - t[0])
+        ajuste = ajustar_modelo_armonico(t, B, omega_espectral(t, B), K_max=1)
+        corridas.append({
+            'etiqueta': f"{ruta} [{serie['nombre']}]",
+            'canales': serie['datos'][:, 1:].T,
+            'fs': round(fs_corrida, 6),
+            'f_rotacion': ajuste['omega'] / (2 * np.pi),
+        })
+
+# Una sola rFFT por lotes para todas las corridas con la misma fs
+for fs_grupo in sorted({c['fs'] for c in corridas}):
+    grupo = [c for c in corridas if c['fs'] == fs_grupo]
+    f_lote, psd_lote = psd_welch_lote([c['canales'] for c in grupo], fs_grupo, nperseg, solape)
+    for c, psd_corrida in zip(grupo, psd_lote):
+        c['rB'] = caracterizar_canal(f_lote, psd_corrida[0], c['f_rotacion'])
+        c['rI'] = caracterizar_canal(f_lote, psd_corrida[1], c['f_rotacion'])
+
+print(f"\nComparación de {len(corridas)} corridas:")
+print(f"  {'Corrida':<28} {'fs (Hz)':>8} {'f_rot (Hz)':>10} {'piso B (mT/√Hz)':>16} {'SNR B':>8} "
+      f"{'piso I (A/√Hz)':>16} {'SNR I':>8}")
+for c in corridas:
+    rB, rI = c['rB'], c['rI']
+    print(f"  {c['etiqueta']:<28} {c['fs']:>8.1f} {c['f_rotacion']:>10.3f} "
+          f"{rB['densidad_ruido']:>16.3e} {rB['snr_dB']:>6.1f}dB "
+          f"{rI['densidad_ruido']:>16.3e} {rI['snr_dB']:>6.1f}dB")
+
+# ============================================================================
+# GRAFICAR ESPECTROS
+# ============================================================================
+
+print("\nGenerando gráfica de espectros...")
+
+fig, ejes = plt.subplots(2, 1, figsize=(12, 10), sharex=True)
+
+for c, (ax, (nombre, unidad)) in enumerate(zip(ejes, canales)):
+    r = resultados[nombre]
+    ax.semilogy(f, psd[c], 'b-', linewidth=1.2, label=f'PSD de {nombre}')
+    ax.axhline(y=r['piso'], color='gray', linestyle='--', linewidth=1.5,
+               label=f"Piso de ruido ({r['densidad_ruido']:.2e} {unidad}/√Hz)")
+    for a in r['armonicos']:
+        ax.axvline(x=a['f'], color='green', alpha=0.4, linewidth=1)
+    for x in r['red']:
+        if x['prominencia_dB'] > 6:
+            ax.axvline(x=x['f'], color='red', alpha=0.5, linewidth=1, linestyle=':')
+    ax.set_ylabel(f'PSD ({unidad}²/Hz)', fontsize=12, fontweight='bold')
+    ax.set_title(f'Densidad espectral de potencia del canal {nombre} '
+                 f'(SNR = {r["snr_dB"]:.1f} dB)', fontsize=13, fontweight='bold')
+    ax.grid(True, alpha=0.3, linestyle='--', which='both')
+    ax.legend(fontsize=10, loc='upper right')
+
+ejes[-1].set_xlabel('Frecuencia (Hz)', fontsize=12, fontweight='bold')
+ejes[0].text(0.02, 0.05, 'Verde: armónicos de rotación\nRojo: componentes de red',
+             transform=ejes[0].transAxes, fontsize=10,
+             bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.9))
+
+plt.tight_layout()
+
+nombre_archivo = 'espectro_ruido.png'
+plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+print(f"✓ Gráfica guardada como '{nombre_archivo}'")
+
+print("\n" + "="*70)
+print("✓ PROCESO COMPLETADO")
+print("="*70)
@@ -0,0 +1,163 @@
+"""
+Benchmark del diezmado antes del ajuste de curva
+Compara tiempo y parámetros del ajuste B_fit = A·sin(ω·t + C) + D con y sin
+diezmado (mismos datos, mismo intervalo; se diezma solo el intervalo, como en
+ajuste_curva_B.py) y verifica que el procesamiento por bloques da el mismo
+resultado que el registro completo
+
+Falla (AssertionError) si con el factor 'auto' ω o A se corren más de
+TOLERANCIA_SIGMA desviaciones estándar del ajuste sin diezmado, o si diezmar y
+ajustar no es más rápido que ajustar sin diezmar.
+Laboratorio de Física - FEM
+"""
+
+import timeit
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+from diezmado import (diezmar, diezmar_intervalo, diezmar_por_bloques, factor_automatico,
+                      armonicos_conservados, disenar_filtro)
+from modelo_armonico import ajustar_modelo_armonico
+
+# ============================================================================
+# PARÁMETROS
+# ============================================================================
+
+archivo = 'datafinal.txt'
+t_inicio, t_fin = 3.0, 4.0      # intervalo de ajuste_curva_B.py, lejos de los bordes que recorta el filtro
+omega_inicial = 54.314376       # rad/s (del ajuste, ajuste_curva_B.py)
+repeticiones = 50
+TOLERANCIA_SIGMA = 0.25         # |Δω|/σω y |ΔA|/σA máximos (σ del ajuste sin diezmado)
+
+
+def modelo_senoidal(t, A, B, C, D):
+    return A * np.sin(B * t + C) + D
+
+
+def ajustar(t, B):
+    p0 = [(B.max() - B.min()) / 2, omega_inicial, 0.0, B.mean()]
+    parametros, covarianza = curve_fit(modelo_senoidal, t, B, p0=p0, maxfev=10000)
+    if parametros[0] < 0:
+        parametros[0], parametros[2] = -parametros[0], (parametros[2] + np.pi) % (2 * np.pi)
+    return parametros, np.sqrt(np.diag(covarianza))
+
+
+def coeficiente_R2(t, B, parametros):
+    residuos = B - modelo_senoidal(t, *parametros)
+    return 1 - np.sum(residuos**2) / np.sum((B - B.mean())**2)
+
+
+def mejor_tiempo(funcion):
+    return min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+
+
+data = np.loadtxt(archivo, skiprows=7, delimiter='\t')
+t_all, B_all = data[:, 0], data[:, 1]
+fs = 1 / (t_all[1] - t_all[0])
+f_rotacion = omega_inicial / (2 * np.pi)
+
+n_intervalo = int(np.sum((t_all >= t_inicio) & (t_all <= t_fin))) - 1
+
+# Sin diezmado, un factor fijo, el límite espectral del 3er armónico (sin
+# ajustar al intervalo), el 'auto' de ajuste_curva_B.py y el que solo conserva
+# la fundamental
+factor_auto = factor_automatico(fs, 3 * f_rotacion, n_intervalo=n_intervalo)
+factores = [1, 5, factor_automatico(fs, 3 * f_rotacion), factor_auto,
+            factor_automatico(fs, f_rotacion, n_intervalo=n_intervalo)]
+
+print("="*112)
+print("BENCHMARK: DIEZMADO ANTES DEL AJUSTE")
+print("="*112)
+print(f"\n  Intervalo de ajuste: [{t_inicio}, {t_fin}] s, fs = {fs:.0f} Hz, "
+      f"f_rot = {f_rotacion:.3f} Hz, mejor de {repeticiones} repeticiones")
+
+# ============================================================================
+# AJUSTE CON CADA FACTOR
+# ============================================================================
+
+def preparar(factor):
+    if factor == 1:
+        mask = (t_all >= t_inicio) & (t_all <= t_fin)
+        return t_all[mask], B_all[mask]
+    return diezmar_intervalo(t_all, B_all, factor, t_inicio, t_fin)
+
+
+def preparar_y_ajustar(factor):
+    return ajustar(*preparar(factor))
+
+
+resultados = []
+for factor in factores:
+    t_exp, B_exp = preparar(factor)
+
+    parametros, errores = ajustar(t_exp, B_exp)
+    R2 = coeficiente_R2(t_exp, B_exp, parametros)
+    K_max = min(8, armonicos_conservados(fs, factor, f_rotacion))
+    armonico = ajustar_modelo_armonico(t_exp, B_exp, omega_inicial, K_max)
+
+    tiempo_diezmado = mejor_tiempo(lambda: preparar(factor))
+    tiempo_ajuste = mejor_tiempo(lambda: ajustar(t_exp, B_exp))
+    # El filtro se diseña una vez por factor y queda en caché; una corrida de
+    # ajuste_curva_B.py paga ese diseño, así que se suma al total
+    tiempo_total = mejor_tiempo(lambda: preparar_y_ajustar(factor))
+    if factor > 1:
+        tiempo_total += mejor_tiempo(lambda: disenar_filtro(factor))
+    tiempo_armonico = mejor_tiempo(lambda: ajustar_modelo_armonico(t_exp, B_exp, omega_inicial, K_max))
+    resultados.append((factor, len(t_exp), parametros, errores, R2, armonico['omega'],
+                       tiempo_diezmado, tiempo_ajuste, tiempo_total, tiempo_armonico))
+
+# El factor 1 incluye la máscara del intervalo en "diezmado" y en "total";
+# "total" = diezmado del intervalo + curve_fit + diseño del filtro
+referencia = resultados[0]
+p_ref, e_ref, tiempo_ref = referencia[2], referencia[3], referencia[8]
+print(f"\n  {'Factor':>6} {'Puntos':>7} {'A (mT)':>10} {'ΔA/σA':>7} {'ω (rad/s)':>11} {'Δω/σω':>7} "
+      f"{'R²':>8} {'ω armónico':>11} {'diezmado':>10} {'curve_fit':>10} {'total':>10} {'armónico':>10}")
+verificaciones = {}
+for factor, n, p, e, R2, omega_arm, t_dz, t_aj, t_tot, t_arm in resultados:
+    desviacion_A = (p[0] - p_ref[0]) / e_ref[0]
+    desviacion_omega = (p[1] - p_ref[1]) / e_ref[1]
+    verificaciones[factor] = (abs(desviacion_omega) <= TOLERANCIA_SIGMA,
+                              abs(desviacion_A) <= TOLERANCIA_SIGMA,
+                              factor == 1 or t_tot < tiempo_ref)
+    print(f"  {factor:>6} {n:>7} {p[0]:>10.5f} {desviacion_A:>+7.2f} {p[1]:>11.5f} "
+          f"{desviacion_omega:>+7.2f} {R2:>8.5f} {omega_arm:>11.5f} {t_dz*1000:>8.2f}ms "
+          f"{t_aj*1000:>8.2f}ms {t_tot*1000:>8.2f}ms {t_arm*1000:>8.2f}ms")
+
+print(f"\n  Aceleración (curve_fit solo / total con diseño del filtro), tolerancia "
+      f"±{TOLERANCIA_SIGMA}σ en ω y A:")
+for factor, _, _, _, _, _, _, t_aj, t_tot, _ in resultados[1:]:
+    ok_omega, ok_A, ok_tiempo = verificaciones[factor]
+    estado = 'pasa' if ok_omega and ok_A and ok_tiempo else 'no pasa'
+    marca = "  ← 'auto'" if factor == factor_auto else ''
+    print(f"    factor {factor:>3}: ×{referencia[7] / t_aj:.1f} / ×{tiempo_ref / t_tot:.1f}  "
+          f"({estado}){marca}")
+
+ok_omega, ok_A, ok_tiempo = verificaciones[factor_auto]
+assert ok_omega, f"factor 'auto' = {factor_auto}: ω se corre más de {TOLERANCIA_SIGMA}σ"
+assert ok_A, f"factor 'auto' = {factor_auto}: A se corre más de {TOLERANCIA_SIGMA}σ"
+assert ok_tiempo, f"factor 'auto' = {factor_auto}: diezmar y ajustar no es más rápido que ajustar"
+
+# ============================================================================
+# PROCESAMIENTO POR BLOQUES
+# ============================================================================
+
+factor = factor_auto
+t_ref, B_ref = diezmar(t_all, B_all, factor)
+bloques = ((t_all[i:i + 777], B_all[i:i + 777]) for i in range(0, len(t_all), 777))
+partes = list(diezmar_por_bloques(bloques, factor))
+t_bloques = np.concatenate([t for t, _ in partes])
+B_bloques = np.concatenate([B for _, B in partes])
+
+print(f"\n  Por bloques de 777 muestras (factor {factor}):")
+print(f"    Marcas de tiempo idénticas: {np.array_equal(t_bloques, t_ref)}")
+print(f"    Diferencia máxima en B:     {np.max(np.abs(B_bloques - B_ref)):.2e} mT")
+# Diezmar solo el intervalo da las mismas muestras que diezmar todo el registro
+# (con la malla alineada al inicio del intervalo) y recortar
+i0 = int(np.searchsorted(t_all, t_inicio))
+t_todo, B_todo = diezmar(t_all[i0 % factor:], B_all[i0 % factor:], factor)
+dentro = (t_todo >= t_inicio) & (t_todo <= t_fin)
+t_int, B_int = diezmar_intervalo(t_all, B_all, factor, t_inicio, t_fin)
+print(f"    Intervalo solo = registro completo recortado: "
+      f"{np.array_equal(t_int, t_todo[dentro]) and np.allclose(B_int, B_todo[dentro])}")
+print("\n" + "="*112)
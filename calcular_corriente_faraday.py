@@ -13,18 +13,13 @@ import matplotlib
 matplotlib.use('Agg')  # Backend sin GUI
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
+from modelo_armonico import ajustar_modelo_armonico, amplitudes_fases, omega_espectral, ModeloSenoidal
+from correlacion_cruzada import retardo_correlacion, retardo_por_ventanas
+from catalogo_corridas import (abrir_catalogo, datos_archivo, buscar_corrida,
+                               registrar_corridas, texto_modelo, leer_modelo, Cronometro)
 
-# ============================================================================
-# PARÁMETROS DEL EXPERIMENTO (Ajustar según su laboratorio)
-# ============================================================================
-
-# Parámetros de la bobina
-N = 200              # Número de vueltas de la bobina
-r_bobina = 0.025     # Radio de la bobina en metros (ejemplo: 2.5 cm)
-A_bobina = np.pi * r_bobina**2  # Área de la bobina en m²
-
-# Resistencia del circuito
-R = 10.0             # Resistencia total en Ohmios (Ω)
+# Parámetros del experimento (N, r_bobina, A_bobina, R): parametros_bobina.py
+from parametros_bobina import N, r_bobina, A_bobina, R
 
 print("="*70)
 print("CÁLCULO DE CORRIENTE USANDO LA LEY DE FARADAY")
@@ -40,8 +35,12 @@ print("="*70)
 # CARGAR DATOS EXPERIMENTALES
 # ============================================================================
 
+archivo_datos = 'datafinal.txt'
+crono = Cronometro()
+
 print("\nCargando datos experimentales...")
-data = np.loadtxt('datafinal.txt', skiprows=7, delimiter='\t')
+with crono.etapa('carga'):
+    data = np.loadtxt(archivo_datos, skiprows=7, delimiter='\t')
 
 # Extraer columnas
 t_all = data[:, 0]      # Tiempo en segundos
@@ -58,61 +57,72 @@ I_exp = I_all[mask]
 print(f"✓ Datos cargados y filtrados: {len(t_exp)} puntos en rango [3.0, 4.0] s")
 
 # ============================================================================
-# PARÁMETROS DEL AJUSTE B_fit(t) = A·sin(B·t + C) + D
+# AJUSTE DEL CAMPO B_fit(t) = D + Σ_k A_k·sin(k·ω·t + C_k)
 # ============================================================================
 
-# Parámetros obtenidos del ajuste de curva (ajuste_curva_B.py)
-# Datos filtrados entre 3.0 y 4.0 segundos
-A_fit = 0.974862       # Amplitud en mT
-B_fit = 54.314376      # Frecuencia angular ω en rad/s
-C_fit = 6.278328       # Fase inicial en rad
-D_fit = 0.201169       # Offset en mT
-
-print("\nParámetros del ajuste B_fit(t) = A·sin(B·t + C) + D:")
-print(f"  A = {A_fit:.6f} mT")
-print(f"  B = {B_fit:.6f} rad/s")
-print(f"  C = {C_fit:.6f} rad")
-print(f"  D = {D_fit:.6f} mT")
+# El modelo multiarmónico se toma del catálogo si ya se ajustó para el mismo
+# archivo e intervalo: primero el de una corrida anterior de este script y si
+# no el de ajuste_curva_B.py (mismo ajuste, K_max = 8 sin diezmado)
+catalogo = abrir_catalogo()
+origen = datos_archivo(archivo_datos)
+registro = buscar_corrida(catalogo, 'calcular_corriente_faraday', origen['hash_archivo'], 3.0, 4.0)
+ajuste_B = buscar_corrida(catalogo, 'ajuste_curva_B', origen['hash_archivo'], 3.0, 4.0)
+
+ajuste_armonico = leer_modelo(registro)
+if ajuste_armonico is not None:
+    print(f"\nModelo recuperado del catálogo (calcular_corriente_faraday, "
+          f"{registro['fecha_analisis']})")
+else:
+    ajuste_armonico = leer_modelo(ajuste_B)
+    if ajuste_armonico is not None:
+        print(f"\nModelo recuperado del catálogo (ajuste_curva_B, {ajuste_B['fecha_analisis']})")
+
+if ajuste_armonico is None:
+    # ω inicial: el del ajuste senoidal catalogado por ajuste_curva_B.py o, si
+    # no hay, el pico del espectro de B_exp
+    if ajuste_B is not None:
+        omega_inicial = ajuste_B['omega']
+        print(f"\nω inicial del catálogo (ajuste_curva_B, {ajuste_B['fecha_analisis']}): "
+              f"{omega_inicial:.6f} rad/s")
+    else:
+        omega_inicial = omega_espectral(t_exp, B_exp)
+        print(f"\nω inicial del espectro de B_exp: {omega_inicial:.6f} rad/s")
+
+    # Modelo multiarmónico: B_fit(t) = D + Σ_k [a_k·sin(kωt) + b_k·cos(kωt)]
+    # K = 1 reproduce exactamente el ajuste senoidal de ajuste_curva_B.py
+    with crono.etapa('ajuste_armonico'):
+        ajuste_armonico = ajustar_modelo_armonico(t_exp, B_exp, omega_inicial, K_max=8)
+K_arm = ajuste_armonico['K']
+omega_arm = ajuste_armonico['omega']
+D_arm, A_k, C_k = amplitudes_fases(ajuste_armonico['coef'])
+
+print(f"\nModelo multiarmónico (K elegido por BIC): K = {K_arm}")
+print(f"  ω  = {omega_arm:.6f} rad/s")
+print(f"  D  = {D_arm:.6f} mT")
+for k in range(K_arm):
+    print(f"  A_{k+1} = {A_k[k]:.6f} mT,  C_{k+1} = {C_k[k]:.6f} rad")
+print(f"  R² = {ajuste_armonico['R2']:.6f}")
+
+# Ecuaciones del modelo ajustado para las gráficas:
+#   B_fit(t) = D + Σ_k A_k·sin(k·ω·t + C_k),  dB_fit/dt = Σ_k k·ω·A_k·cos(k·ω·t + C_k)
+def _argumento(k):
+    factor = '' if k == 1 else f'{k} \\cdot '
+    return f'{factor}{omega_arm:.4f} t {C_k[k - 1]:+.4f}'
+
+texto_B_fit = ('$B_{fit}(t) = ' + f'{D_arm:.4f}' + ''.join(
+    f' {A_k[k - 1]:+.4f} \\sin({_argumento(k)})' for k in range(1, K_arm + 1)) + '$ mT')
+texto_dB_fit = ('$\\frac{dB_{fit}}{dt} = ' + ''.join(
+    f' {k * omega_arm * A_k[k - 1]:+.4f} \\cos({_argumento(k)})' for k in range(1, K_arm + 1)) + '$ mT/s')
 
 # ============================================================================
-# FUNCIONES
+# MODELO DEL CAMPO
 # ============================================================================
 
-def B_fit_func(t):
-    """
-    Función del campo magnético ajustado B_fit(t)
-    Retorna B en mT
-    """
-    return A_fit * np.sin(B_fit * t + C_fit) + D_fit
-
-def dB_fit_dt(t):
-    """
-    Derivada temporal del campo magnético dB_fit/dt
-    dB_fit/dt = A·B·cos(B·t + C)
-    Retorna dB/dt en mT/s
-    """
-    return A_fit * B_fit * np.cos(B_fit * t + C_fit)
-
-def calcular_corriente_faraday(t):
-    """
-    Calcula la corriente I(t) usando la Ley de Faraday
-
-    ε_ind = -N·A·(dB_fit/dt)
-    I(t) = ε_ind / R
-
-    Nota: dB_fit/dt está en mT/s, hay que convertir a T/s
-    1 mT = 10^-3 T
-    """
-    # Convertir dB/dt de mT/s a T/s
-    dB_dt_Tesla_s = dB_fit_dt(t) * 1e-3  # T/s
-
-    # FEM inducida (Ley de Faraday)
-    epsilon_ind = -N * A_bobina * dB_dt_Tesla_s  # Voltios
-
-    # Corriente (Ley de Ohm)
-    I_teorica = epsilon_ind / R  # Amperios
-
-    return I_teorica
+# B_fit(t), dB_fit/dt e I(t) comparten los términos sin(kωt), cos(kωt) de la
+# malla t_exp, que el modelo calcula una sola vez:
+#   dB_fit/dt = Σ_k k·ω·[a_k·cos(kωt) - b_k·sin(kωt)]
+#   ε_ind = -N·A·(dB_fit/dt),  I(t) = ε_ind / R   (dB/dt en mT/s → T/s)
+modelo = ModeloSenoidal.desde_ajuste(ajuste_armonico)
 
 # ============================================================================
 # CÁLCULO DE LA CORRIENTE TEÓRICA
@@ -121,11 +131,12 @@ def calcular_corriente_faraday(t):
 print("\nCalculando corriente teórica I(t) usando la Ley de Faraday...")
 
 # Calcular B_fit y dB_fit/dt para todos los tiempos
-B_fit_vals = B_fit_func(t_exp)
-dB_dt_vals = dB_fit_dt(t_exp)
+B_fit_vals = modelo.valor(t_exp)
+dB_dt_vals = modelo.derivada(t_exp)
 
 # Calcular corriente teórica
-I_teorica = calcular_corriente_faraday(t_exp)
+with crono.etapa('corriente_faraday'):
+    I_teorica = modelo.corriente_faraday(t_exp, N, A_bobina, R)
 
 print(f"✓ Corriente teórica calculada")
 
@@ -189,8 +200,8 @@ ax2.legend(fontsize=12)
 
 # Cuadro con la función B_fit
 b_fit_texto = (
-    f'$B_{{fit}}(t) = {A_fit:.4f} \\cdot \\sin({B_fit:.4f} \\cdot t {C_fit:+.4f}) {D_fit:+.4f}$ mT\n'
-    f'$\\frac{{dB_{{fit}}}}{{dt}} = {A_fit*B_fit:.4f} \\cdot \\cos({B_fit:.4f} \\cdot t {C_fit:+.4f})$ mT/s'
+    f'{texto_B_fit}\n'
+    f'{texto_dB_fit}'
 )
 
 ax2.text(0.98, 0.97, b_fit_texto, transform=ax2.transAxes,
@@ -275,7 +286,7 @@ texto_ecuaciones = (
     f'$A = {A_bobina*1e4:.4f}$ cm² = ${A_bobina:.6f}$ m²\n'
     f'$R = {R:.1f}$ Ω\n\n'
     f'Campo magnético ajustado:\n'
-    f'$B_{{fit}}(t) = {A_fit:.4f} \\sin({B_fit:.4f}t {C_fit:+.4f}) {D_fit:+.4f}$ mT'
+    f'{texto_B_fit}'
 )
 
 ax.text(0.02, 0.98, texto_ecuaciones, transform=ax.transAxes,
@@ -295,11 +306,6 @@ print(f"✓ Gráfica simple guardada como '{nombre_archivo3}'")
 
 # Calcular diferencia entre teórica y experimental
 diferencia = I_teorica - I_exp
-error_relativo = np.abs(diferencia / I_exp) * 100  # Error porcentual
-
-# Filtrar valores donde I_exp es muy pequeño para evitar divisiones por cero
-mask = np.abs(I_exp) > 1e-6
-error_relativo_filtrado = error_relativo[mask]
 
 print("\nAnálisis de diferencias entre I_teorica e I_exp:")
 print(f"  Diferencia máxima:     {diferencia.max()*1000:.6f} mA")
@@ -307,10 +313,98 @@ print(f"  Diferencia mínima:     {diferencia.min()*1000:.6f} mA")
 print(f"  Diferencia promedio:   {diferencia.mean()*1000:.6f} mA")
 print(f"  RMS de la diferencia:  {np.sqrt(np.mean(diferencia**2))*1000:.6f} mA")
 
-if len(error_relativo_filtrado) > 0:
-    print(f"\nError relativo (donde |I_exp| > 1 µA):")
-    print(f"  Error promedio:        {error_relativo_filtrado.mean():.2f}%")
-    print(f"  Error máximo:          {error_relativo_filtrado.max():.2f}%")
+# ============================================================================
+# RETARDO ENTRE I_teorica E I_exp (CORRELACIÓN CRUZADA POR FFT)
+# ============================================================================
+
+# Se busca el retardo dentro de ±T/4 y por |ρ| para que la polaridad de la
+# bobina (signo de ρ) no se confunda con un desfase de medio período
+dt = t_all[1] - t_all[0]
+periodo_rot = 2 * np.pi / omega_arm
+max_lag = int(periodo_rot / 4 / dt)
+
+retardo_I, rho_I = retardo_correlacion(I_teorica, I_exp, dt, max_lag, por_modulo=True)
+fase_I = 2 * np.pi * retardo_I / periodo_rot
+
+print("\nRetardo de I_exp respecto a I_teorica (3.0 - 4.0 s):")
+print(f"  Retardo:               {retardo_I*1000:.3f} ms")
+print(f"  Desfase:               {np.degrees(fase_I):.2f}°")
+print(f"  Correlación ρ:         {rho_I:.4f}")
+
+# Error RMS normalizado tras corregir la polaridad (signo de ρ) y el retardo:
+# I_teorica se evalúa en t - retardo sobre el modelo analítico. No divide
+# muestra a muestra por I_exp, que se anula en cada cruce por cero.
+I_alineada = np.sign(rho_I) * modelo.corriente_faraday(t_exp - retardo_I, N, A_bobina, R)
+I_exp_centrada = I_exp - I_exp.mean()
+error_rms_normalizado = np.sqrt(
+    np.mean((I_alineada - I_alineada.mean() - I_exp_centrada)**2) / np.mean(I_exp_centrada**2)
+) * 100
+print(f"  RMS normalizado:       {error_rms_normalizado:.2f}% de la RMS de I_exp "
+      f"(alineada en polaridad y retardo)")
+
+# Mismo análisis sobre todo el registro, en ventanas deslizantes:
+# -dB/dt medido (proporcional a la FEM de Faraday) frente a I medida
+ancho_ventana = int(round(4 * periodo_rot / dt))   # ~4 períodos
+paso_ventana = int(round(0.1 / dt))                # cada 0.1 s
+dB_dt_medido = np.gradient(B_all, t_all)
+
+with crono.etapa('retardo_ventanas'):
+    t_ventanas, retardo_ventanas, rho_ventanas = retardo_por_ventanas(
+        t_all, -dB_dt_medido, I_all, ancho_ventana, paso_ventana, max_lag, por_modulo=True
+    )
+fase_ventanas = np.degrees(2 * np.pi * retardo_ventanas / periodo_rot)
+
+print(f"\nRetardo B→I en {len(t_ventanas)} ventanas de {ancho_ventana*dt:.3f} s (registro completo):")
+print(f"  Retardo medio:         {retardo_ventanas.mean()*1000:.3f} ± {retardo_ventanas.std()*1000:.3f} ms")
+print(f"  Desfase medio:         {fase_ventanas.mean():.2f}° ± {fase_ventanas.std():.2f}°")
+print(f"  Correlación ρ media:   {rho_ventanas.mean():.4f}")
+
+fig4, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+
+ax1.plot(t_ventanas, fase_ventanas, 'b.-', linewidth=1.5, label='Desfase de $I$ respecto a $-dB/dt$')
+ax1.axhline(y=0, color='k', linestyle='-', linewidth=0.8)
+ax1.axvspan(3.0, 4.0, color='orange', alpha=0.2, label='Intervalo del ajuste')
+ax1.set_ylabel('Desfase (°)', fontsize=12, fontweight='bold')
+ax1.set_title('Retardo B→I por correlación cruzada en ventanas deslizantes',
+              fontsize=14, fontweight='bold')
+ax1.grid(True, alpha=0.3, linestyle='--')
+ax1.legend(fontsize=11)
+
+ax2.plot(t_ventanas, rho_ventanas, 'r.-', linewidth=1.5, label='Correlación normalizada ρ')
+ax2.axvspan(3.0, 4.0, color='orange', alpha=0.2)
+ax2.set_xlabel('Tiempo (s)', fontsize=12, fontweight='bold')
+ax2.set_ylabel('ρ', fontsize=12, fontweight='bold')
+ax2.grid(True, alpha=0.3, linestyle='--')
+ax2.legend(fontsize=11)
+
+plt.tight_layout()
+
+nombre_archivo4 = 'retardo_faraday.png'
+plt.savefig(nombre_archivo4, dpi=300, bbox_inches='tight')
+print(f"✓ Gráfica de retardo guardada como '{nombre_archivo4}'")
+
+# Registrar la corrida en el catálogo, salvo que ya esté con el mismo modelo y
+# los mismos parámetros de la bobina
+if (registro is not None and registro['modelo'] is not None
+        and (registro['N'], registro['r_bobina'], registro['R']) == (N, r_bobina, R)):
+    print("\n✓ La corrida ya estaba en el catálogo; no se vuelve a registrar")
+else:
+    registrar_corridas(catalogo, [{
+        **origen,
+        'script': 'calcular_corriente_faraday',
+        't_inicio': 3.0, 't_fin': 4.0, 'n_puntos': len(t_exp),
+        'omega': omega_arm, 'error_omega': ajuste_armonico['errores'][0],
+        'R2': ajuste_armonico['R2'], 'K_armonicos': K_arm,
+        'I_pico_exp': (I_exp.max() - I_exp.min()) / 2,
+        'I_pico_teo': (I_teorica.max() - I_teorica.min()) / 2,
+        'N': N, 'r_bobina': r_bobina, 'R': R,
+        'modelo': texto_modelo(omega_arm, ajuste_armonico['coef'], K=K_arm,
+                               errores=ajuste_armonico['errores'],
+                               R2=ajuste_armonico['R2'], rms=ajuste_armonico['rms'],
+                               tabla_criterio=ajuste_armonico['tabla_criterio']),
+        'tiempos': crono.tiempos,
+    }])
+    print("\n✓ Resultados registrados en el catálogo de corridas")
 
 print("\n" + "="*70)
 print("✓ PROCESO COMPLETADO EXITOSAMENTE")
@@ -319,6 +413,7 @@ print("\nArchivos generados:")
 print(f"  1. {nombre_archivo1}")
 print(f"  2. {nombre_archivo2}")
 print(f"  3. {nombre_archivo3}")
+print(f"  4. {nombre_archivo4}")
 print("\nNOTA: Si las corrientes teórica y experimental no coinciden bien,")
-print("      ajuste los parámetros N, A y R en la sección de parámetros del script.")
+print("      ajuste los parámetros N, A y R en parametros_bobina.py.")
 print("="*70)
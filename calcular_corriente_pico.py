@@ -9,6 +9,10 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.patches import FancyBboxPatch
+from modelo_armonico import ajustar_modelo_armonico, omega_espectral, ModeloSenoidal
+from parametros_bobina import N, r_bobina, A_bobina, R
+from catalogo_corridas import (abrir_catalogo, datos_archivo, buscar_corrida,
+                               registrar_corridas, texto_modelo, leer_modelo, Cronometro)
 
 # ============================================================================
 # CARGAR DATOS EXPERIMENTALES
@@ -18,7 +22,11 @@ print("="*70)
 print("CÁLCULO DE CORRIENTE PICO (I_pico) - LEY DE FARADAY")
 print("="*70)
 
-data = np.loadtxt('datafinal.txt', skiprows=7, delimiter='\t')
+archivo_datos = 'datafinal.txt'
+crono = Cronometro()
+
+with crono.etapa('carga'):
+    data = np.loadtxt(archivo_datos, skiprows=7, delimiter='\t')
 t_all = data[:, 0]
 B_all = data[:, 1]
 I_all = data[:, 2]
@@ -60,12 +68,21 @@ print(f"  I_pico_exp = (I_max - I_min) / 2 = {I_pico_exp:.6f} A = {I_pico_exp*10
 # PASO 3: CALCULAR I_pico TEÓRICO (LEY DE FARADAY)
 # ============================================================================
 
-# Parámetros del sistema
-N = 200  # vueltas
-r_bobina = 0.025  # radio en metros
-A_bobina = np.pi * r_bobina**2  # área en m²
-omega = 54.314376  # rad/s (del ajuste)
-R = 10.0  # Resistencia en Ω
+# Parámetros del sistema: N, r, A y R en parametros_bobina.py; ω del ajuste
+# senoidal de B_exp (un armónico), partiendo del pico de su espectro. Si la
+# corrida ya está catalogada con su modelo, ω se toma de ahí sin reajustar.
+catalogo = abrir_catalogo()
+origen = datos_archivo(archivo_datos)
+anterior = buscar_corrida(catalogo, 'calcular_corriente_pico', origen['hash_archivo'], 3.0, 4.0)
+modelo_guardado = leer_modelo(anterior)
+
+if modelo_guardado is not None:
+    omega = modelo_guardado['omega']
+    print(f"\nω recuperado del catálogo ({anterior['fecha_analisis']})")
+else:
+    with crono.etapa('ajuste_omega'):
+        omega = ajustar_modelo_armonico(t_exp, B_exp, omega_espectral(t_exp, B_exp),
+                                        K_max=1)['omega']
 
 print("\nPASO 3: Calcular I_pico teórico usando Ley de Faraday")
 print(f"\nParámetros del sistema:")
@@ -81,8 +98,10 @@ print(f"  ε_ind = -N · dΦ/dt = N · B_pico · A · ω · sin(ωt)")
 print(f"  I(t) = ε_ind / R")
 print(f"  I_pico = N · B_pico · A · ω / R  (cuando sin(ωt) = 1)")
 
-# Calcular I_pico teórico
-I_pico_teo = N * B_pico_T * A_bobina * omega / R
+# Calcular I_pico teórico con el modelo B(t) = B_pico·cos(ωt) = B_pico·sin(ωt + π/2)
+with crono.etapa('corriente_pico'):
+    modelo = ModeloSenoidal.desde_senoidal(B_pico_mT, omega, np.pi / 2, 0.0)
+    I_pico_teo = modelo.amplitud_corriente(N, A_bobina, R)
 
 print(f"\nSustituyendo:")
 print(f"  I_pico_teo = ({N} × {B_pico_T:.6f} × {A_bobina:.6f} × {omega:.6f}) / {R:.2f}")
@@ -107,6 +126,28 @@ print(f"\nCálculo inverso de resistencia efectiva:")
 print(f"  R_efectiva = N · B_pico · A · ω / I_pico_exp")
 print(f"  R_efectiva = {R_efectiva:.2f} Ω")
 
+# Registrar la corrida en el catálogo, salvo que ya esté con el mismo modelo y
+# los mismos parámetros de la bobina
+if anterior is not None:
+    print(f"\nCorrida anterior en el catálogo ({anterior['fecha_analisis']}):")
+    print(f"  I_pico_teo = {anterior['I_pico_teo']*1000:.3f} mA, R_efectiva = {anterior['R_efectiva']:.2f} Ω")
+if (modelo_guardado is not None
+        and (anterior['N'], anterior['r_bobina'], anterior['R']) == (N, r_bobina, R)):
+    print("  La corrida ya estaba en el catálogo; no se vuelve a registrar")
+else:
+    registrar_corridas(catalogo, [{
+        **origen,
+        'script': 'calcular_corriente_pico',
+        't_inicio': 3.0, 't_fin': 4.0, 'n_puntos': len(t_exp),
+        # A y omega quedan en NULL: son columnas del ajuste de B (ajuste_curva_B.py)
+        # y B_pico = (B_max - B_min)/2 no es una amplitud ajustada; el ω usado
+        # se guarda en el modelo
+        'I_pico_exp': I_pico_exp, 'I_pico_teo': I_pico_teo,
+        'N': N, 'r_bobina': r_bobina, 'R': R, 'R_efectiva': R_efectiva,
+        'modelo': texto_modelo(omega, modelo.coef),
+        'tiempos': crono.tiempos,
+    }])
+
 # ============================================================================
 # CREAR VISUALIZACIÓN
 # ============================================================================
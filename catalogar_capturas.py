@@ -0,0 +1,48 @@
+"""
+Script para indexar todas las capturas Vernier de un directorio (recursivo)
+Lee solo encabezados y primera/última fila; los archivos sin cambios se omiten
+
+Uso: python catalogar_capturas.py [directorio] [desde] [hasta]
+     (fechas en formato ISO, p. ej. 2025-11-13 o 2025-11-13T15:00:00;
+      un hasta sin hora incluye todo ese día)
+
+Laboratorio de Física - FEM
+"""
+
+import sys
+import time
+
+from escaneo_vernier import escanear_directorio
+from catalogo_corridas import (abrir_catalogo, registrar_capturas,
+                               capturas_catalogadas, buscar_capturas)
+
+raiz = sys.argv[1] if len(sys.argv) > 1 else '.'
+desde = sys.argv[2] if len(sys.argv) > 2 else None
+hasta = sys.argv[3] if len(sys.argv) > 3 else None
+
+print("="*70)
+print("CATÁLOGO DE CAPTURAS VERNIER")
+print("="*70)
+
+catalogo = abrir_catalogo()
+
+inicio = time.perf_counter()
+capturas, errores = escanear_directorio(raiz, omitir=capturas_catalogadas(catalogo))
+n_registradas = registrar_capturas(catalogo, capturas)
+duracion_escaneo = time.perf_counter() - inicio
+
+print(f"\n  Directorio:           {raiz}")
+print(f"  Capturas nuevas o modificadas: {n_registradas}")
+print(f"  Archivos ignorados (no Vernier): {len(errores)}")
+print(f"  Tiempo de escaneo:    {duracion_escaneo*1000:.1f} ms")
+
+filas = buscar_capturas(catalogo, desde, hasta)
+print(f"\n{len(filas)} capturas en el catálogo" +
+      (f" entre {desde or '—'} y {hasta or '—'}" if desde or hasta else "") + ":\n")
+print(f"  {'Captura':<20} {'Serie':<10} {'fs (Hz)':>8} {'Duración':>9} {'Filas':>8}  Archivo")
+for fila in filas:
+    aviso = '  (varias series)' if fila['varias_series'] else ''
+    print(f"  {fila['fecha_captura'] or '—':<20} {fila['serie']:<10} {fila['fs'] or 0:>8.1f} "
+          f"{fila['duracion']:>8.3f}s {fila['n_filas']:>8}  {fila['ruta']}{aviso}")
+
+print("\n" + "="*70)
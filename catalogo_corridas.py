@@ -0,0 +1,396 @@
+"""
+Catálogo local (SQLite) con el historial de resultados de los análisis
+
+Cada ejecución de un script de análisis registra una fila en 'corridas' con el
+archivo de origen (hash SHA-256 y fecha de captura del encabezado Vernier), el
+intervalo analizado, los parámetros del ajuste con sus errores, R², las corrientes
+pico y los parámetros de la bobina; los tiempos de cada etapa van en
+'tiempos_etapas'. Antes de recalcular, los scripts consultan el catálogo con
+buscar_corrida, y las tendencias se responden solo con consultas SQL. La
+columna 'modelo' guarda (en JSON) el modelo ajustado completo, para que un
+script pueda reconstruirlo sin repetir el ajuste.
+
+La tabla 'capturas' indexa los archivos Vernier encontrados por el escaneo de
+encabezados (escaneo_vernier.py): fecha de captura, serie, columnas, unidades,
+frecuencia de muestreo, duración y número de filas.
+
+Laboratorio de Física - FEM
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from datos_vernier import leer_encabezado_vernier
+
+RUTA_CATALOGO = 'catalogo_corridas.sqlite'
+
+COLUMNAS_CORRIDA = (
+    'script', 'archivo', 'hash_archivo', 'fecha_captura', 'serie',
+    't_inicio', 't_fin', 'n_puntos', 'factor_diezmado',
+    'A', 'error_A', 'omega', 'error_omega', 'C', 'error_C', 'D', 'error_D',
+    'R2', 'K_armonicos',
+    'I_pico_exp', 'I_pico_teo',
+    'N', 'r_bobina', 'R', 'L', 'R_efectiva',
+    'modelo',
+)
+
+_POR_DEFECTO = {'factor_diezmado': 1}
+
+# PRAGMA user_version del esquema actual:
+#   0: catálogo original, sin factor_diezmado
+#   1: columna factor_diezmado incluida en la clave UNIQUE
+#   2: columna modelo (JSON con omega, coef y errores del ajuste)
+VERSION_ESQUEMA = 2
+
+# Columnas agregadas después de la versión 0, con su tipo para ALTER TABLE
+_COLUMNAS_AGREGADAS = (
+    ('factor_diezmado', 'INTEGER NOT NULL DEFAULT 1'),
+    ('modelo', 'TEXT'),
+)
+
+_TABLA_CORRIDAS = """
+CREATE TABLE IF NOT EXISTS {nombre} (
+    id             INTEGER PRIMARY KEY,
+    fecha_analisis TEXT NOT NULL,
+    script         TEXT NOT NULL,
+    archivo        TEXT NOT NULL,
+    hash_archivo   TEXT NOT NULL,
+    fecha_captura  TEXT,
+    serie          TEXT,
+    t_inicio       REAL,
+    t_fin          REAL,
+    n_puntos       INTEGER,
+    factor_diezmado INTEGER NOT NULL DEFAULT 1,
+    A REAL, error_A REAL,
+    omega REAL, error_omega REAL,
+    C REAL, error_C REAL,
+    D REAL, error_D REAL,
+    R2 REAL,
+    K_armonicos INTEGER,
+    I_pico_exp REAL,
+    I_pico_teo REAL,
+    N INTEGER, r_bobina REAL, R REAL, L REAL,
+    R_efectiva REAL,
+    modelo     TEXT,
+    UNIQUE (script, hash_archivo, t_inicio, t_fin, factor_diezmado)
+);
+"""
+
+_INDICES_CORRIDAS = """
+CREATE INDEX IF NOT EXISTS idx_corridas_fecha_captura ON corridas (fecha_captura);
+CREATE INDEX IF NOT EXISTS idx_corridas_omega ON corridas (omega);
+CREATE INDEX IF NOT EXISTS idx_corridas_bobina ON corridas (N, r_bobina, R);
+CREATE INDEX IF NOT EXISTS idx_corridas_archivo ON corridas (hash_archivo, t_inicio, t_fin);
+"""
+
+_ESQUEMA = _TABLA_CORRIDAS.format(nombre='corridas') + _INDICES_CORRIDAS + """
+CREATE TABLE IF NOT EXISTS capturas (
+    ruta          TEXT PRIMARY KEY,
+    tamano        INTEGER NOT NULL,
+    mtime         REAL NOT NULL,
+    fecha_captura TEXT,
+    archivo_cmbl  TEXT,
+    serie         TEXT,
+    columnas      TEXT,
+    unidades      TEXT,
+    fs            REAL,
+    duracion      REAL,
+    n_filas       INTEGER,
+    varias_series INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_capturas_fecha_captura ON capturas (fecha_captura);
+
+CREATE TABLE IF NOT EXISTS tiempos_etapas (
+    corrida_id INTEGER NOT NULL REFERENCES corridas (id) ON DELETE CASCADE,
+    etapa      TEXT NOT NULL,
+    segundos   REAL NOT NULL,
+    PRIMARY KEY (corrida_id, etapa)
+);
+"""
+
+
+def _migrar_esquema(con, version):
+    """
+    Lleva un catálogo de una versión anterior a VERSION_ESQUEMA
+
+    Las columnas nuevas se agregan con ALTER TABLE. Para la versión 1 además
+    hay que cambiar la clave UNIQUE, que SQLite no permite modificar con ALTER
+    TABLE, así que la tabla se reconstruye: se crea la nueva, se copian las
+    filas (conservando los id, a los que apunta tiempos_etapas), se reemplaza
+    la anterior y se recrean los índices. Las claves foráneas se desactivan
+    durante la reconstrucción para que DROP TABLE no borre en cascada los
+    tiempos de cada etapa.
+    """
+    columnas = [fila[1] for fila in con.execute("PRAGMA table_info(corridas)")]
+    con.execute('PRAGMA foreign_keys = OFF')
+    try:
+        with con:
+            for nombre, tipo in _COLUMNAS_AGREGADAS:
+                if nombre not in columnas:
+                    con.execute(f"ALTER TABLE corridas ADD COLUMN {nombre} {tipo}")
+            if version < 1:
+                lista = ', '.join(('id', 'fecha_analisis') + COLUMNAS_CORRIDA)
+                con.execute(_TABLA_CORRIDAS.format(nombre='corridas_nueva'))
+                con.execute(f"INSERT INTO corridas_nueva ({lista}) SELECT {lista} FROM corridas")
+                con.execute("DROP TABLE corridas")
+                con.execute("ALTER TABLE corridas_nueva RENAME TO corridas")
+                for sentencia in _INDICES_CORRIDAS.strip().splitlines():
+                    con.execute(sentencia)
+            con.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+    finally:
+        con.execute('PRAGMA foreign_keys = ON')
+
+
+def abrir_catalogo(ruta=RUTA_CATALOGO):
+    """Abre (o crea) el catálogo, migra esquemas anteriores y asegura los índices"""
+    con = sqlite3.connect(ruta)
+    con.row_factory = sqlite3.Row
+    con.execute('PRAGMA foreign_keys = ON')
+
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    existe = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'corridas'"
+    ).fetchone()
+    if existe and version < VERSION_ESQUEMA:
+        _migrar_esquema(con, version)
+
+    con.executescript(_ESQUEMA)
+    con.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+    return con
+
+
+def texto_modelo(omega, coef, **extra):
+    """
+    Texto JSON de un modelo ajustado para la columna 'modelo'
+    extra: otros resultados del ajuste (errores, R2, rms, ...); los arreglos
+    de numpy se guardan como listas
+    """
+    def nativo(valor):
+        if isinstance(valor, dict):
+            return {str(k): nativo(v) for k, v in valor.items()}
+        return valor.tolist() if hasattr(valor, 'tolist') else valor
+    return json.dumps({'omega': nativo(omega), 'coef': nativo(coef),
+                       **{k: nativo(v) for k, v in extra.items()}})
+
+
+def leer_modelo(registro):
+    """
+    Diccionario del modelo guardado en una corrida (omega, coef como arreglo y
+    los demás campos guardados), o None si la corrida no tiene modelo
+    """
+    if registro is None or registro['modelo'] is None:
+        return None
+    modelo = json.loads(registro['modelo'])
+    modelo['coef'] = np.asarray(modelo['coef'], dtype=float)
+    if 'errores' in modelo:
+        modelo['errores'] = np.asarray(modelo['errores'], dtype=float)
+    if 'tabla_criterio' in modelo:
+        # JSON guarda las claves como texto
+        modelo['tabla_criterio'] = {int(k): v for k, v in modelo['tabla_criterio'].items()}
+    return modelo
+
+
+def actualizar_modelo(con, corrida_id, modelo):
+    """Guarda el modelo (texto de texto_modelo) de una corrida ya registrada"""
+    with con:
+        con.execute("UPDATE corridas SET modelo = ? WHERE id = ?", (modelo, corrida_id))
+
+
+def hash_archivo(ruta, tamano_bloque=1 << 20):
+    """SHA-256 del contenido del archivo, leído por bloques"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def datos_archivo(ruta):
+    """Columnas de identificación del archivo de origen: archivo, hash, fecha y serie"""
+    encabezado = leer_encabezado_vernier(ruta)
+    fecha = encabezado['fecha_captura']
+    return {
+        'archivo': str(ruta),
+        'hash_archivo': hash_archivo(ruta),
+        'fecha_captura': fecha.isoformat() if fecha else None,
+        'serie': encabezado['serie'],
+    }
+
+
+class Cronometro:
+    """Acumula la duración de cada etapa de un análisis: with crono.etapa('ajuste'): ..."""
+
+    __slots__ = ('tiempos',)
+
+    def __init__(self):
+        self.tiempos = {}
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tiempos[nombre] = self.tiempos.get(nombre, 0.0) + time.perf_counter() - inicio
+
+
+def _condiciones_fecha(desde, hasta):
+    """
+    Condiciones SQL y parámetros para limitar fecha_captura a [desde, hasta]
+
+    desde, hasta: datetime, date o texto ISO. Un hasta sin hora (date o
+    'AAAA-MM-DD') incluye todo ese día: se compara con el día siguiente
+    como límite exclusivo, porque fecha_captura guarda también la hora.
+    """
+    condiciones, parametros = [], []
+    if desde is not None:
+        condiciones.append("fecha_captura >= ?")
+        parametros.append(desde.isoformat() if isinstance(desde, date) else desde)
+    if hasta is not None:
+        if isinstance(hasta, str) and len(hasta) == 10:
+            hasta = date.fromisoformat(hasta)
+        if isinstance(hasta, date) and not isinstance(hasta, datetime):
+            condiciones.append("fecha_captura < ?")
+            parametros.append((hasta + timedelta(days=1)).isoformat())
+        else:
+            condiciones.append("fecha_captura <= ?")
+            parametros.append(hasta.isoformat() if isinstance(hasta, datetime) else hasta)
+    return condiciones, parametros
+
+
+def _valor_sql(valor):
+    # Los escalares de numpy se guardan como tipos nativos de Python
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+def registrar_corridas(con, registros):
+    """
+    Inserta un lote de corridas en una sola transacción
+
+    registros: iterable de diccionarios con claves de COLUMNAS_CORRIDA (las
+    ausentes quedan en NULL) y opcionalmente 'tiempos' = {etapa: segundos}.
+    Una corrida con el mismo script, archivo, intervalo y factor de diezmado
+    reemplaza a la anterior.
+    Retorna la lista de ids insertados.
+    """
+    columnas = ', '.join(('fecha_analisis',) + COLUMNAS_CORRIDA)
+    marcadores = ', '.join('?' * (len(COLUMNAS_CORRIDA) + 1))
+    sql = f"INSERT OR REPLACE INTO corridas ({columnas}) VALUES ({marcadores})"
+
+    fecha_analisis = datetime.now().isoformat(timespec='seconds')
+    ids = []
+    tiempos = []
+    with con:
+        for registro in registros:
+            fila = [fecha_analisis] + [_valor_sql(registro.get(c, _POR_DEFECTO.get(c)))
+                                       for c in COLUMNAS_CORRIDA]
+            corrida_id = con.execute(sql, fila).lastrowid
+            ids.append(corrida_id)
+            tiempos.extend((corrida_id, etapa, float(segundos))
+                           for etapa, segundos in registro.get('tiempos', {}).items())
+        con.executemany(
+            "INSERT INTO tiempos_etapas (corrida_id, etapa, segundos) VALUES (?, ?, ?)",
+            tiempos
+        )
+    return ids
+
+
+def buscar_corrida(con, script, hash_archivo, t_inicio, t_fin, factor_diezmado=1):
+    """Resultado ya catalogado para el mismo script, archivo, intervalo y diezmado, o None"""
+    return con.execute(
+        """SELECT * FROM corridas
+           WHERE hash_archivo = ? AND t_inicio = ? AND t_fin = ? AND script = ?
+                 AND factor_diezmado = ?""",
+        (hash_archivo, t_inicio, t_fin, script, factor_diezmado)
+    ).fetchone()
+
+
+def tiempos_corrida(con, corrida_id):
+    """Diccionario {etapa: segundos} de una corrida"""
+    filas = con.execute(
+        "SELECT etapa, segundos FROM tiempos_etapas WHERE corrida_id = ?", (corrida_id,)
+    )
+    return {etapa: segundos for etapa, segundos in filas}
+
+
+def tendencia(con, columna, script=None, desde=None, hasta=None):
+    """
+    Serie temporal (fecha_captura, valor) de una columna numérica del catálogo
+
+    desde, hasta: límites de fecha de captura (ver _condiciones_fecha)
+    """
+    if columna not in COLUMNAS_CORRIDA:
+        raise ValueError(f"Columna desconocida: '{columna}'")
+    condiciones, parametros = _condiciones_fecha(desde, hasta)
+    condiciones.insert(0, f"{columna} IS NOT NULL")
+    if script is not None:
+        condiciones.append("script = ?")
+        parametros.append(script)
+    sql = (f"SELECT fecha_captura, {columna} FROM corridas "
+           f"WHERE {' AND '.join(condiciones)} ORDER BY fecha_captura")
+    return con.execute(sql, parametros).fetchall()
+
+
+def resumen_por_captura(con):
+    """Una fila por archivo e intervalo con ω, R², I_pico y R_efectiva catalogados"""
+    return con.execute(
+        """SELECT fecha_captura, archivo, serie,
+                  MAX(CASE WHEN script = 'ajuste_curva_B' THEN omega END)             AS omega,
+                  MAX(CASE WHEN script = 'ajuste_curva_B' THEN error_omega END)       AS error_omega,
+                  MAX(CASE WHEN script = 'ajuste_curva_B' THEN R2 END)                AS R2,
+                  MAX(CASE WHEN script = 'calcular_corriente_pico' THEN I_pico_exp END) AS I_pico_exp,
+                  MAX(CASE WHEN script = 'calcular_corriente_pico' THEN I_pico_teo END) AS I_pico_teo,
+                  MAX(CASE WHEN script = 'calcular_corriente_pico' THEN R_efectiva END) AS R_efectiva
+           FROM corridas
+           WHERE factor_diezmado = 1
+           GROUP BY hash_archivo, t_inicio, t_fin
+           ORDER BY fecha_captura"""
+    ).fetchall()
+
+
+def registrar_capturas(con, capturas):
+    """
+    Inserta o actualiza un lote de capturas escaneadas en una sola transacción
+    capturas: diccionarios devueltos por escaneo_vernier.escanear_vernier
+    """
+    filas = [
+        (c['ruta'], c['tamano'], c['mtime'],
+         c['fecha_captura'].isoformat() if c['fecha_captura'] else None,
+         c['archivo_cmbl'], c['serie'],
+         '\t'.join(c['columnas']), '\t'.join(c['unidades']),
+         c['fs'], c['duracion'], c['n_filas'], int(c['varias_series']))
+        for c in capturas
+    ]
+    with con:
+        con.executemany(
+            """INSERT OR REPLACE INTO capturas
+               (ruta, tamano, mtime, fecha_captura, archivo_cmbl, serie,
+                columnas, unidades, fs, duracion, n_filas, varias_series)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            filas
+        )
+    return len(filas)
+
+
+def capturas_catalogadas(con):
+    """Diccionario {ruta: (tamano, mtime)} para omitir archivos que no cambiaron"""
+    return {ruta: (tamano, mtime)
+            for ruta, tamano, mtime in con.execute("SELECT ruta, tamano, mtime FROM capturas")}
+
+
+def buscar_capturas(con, desde=None, hasta=None):
+    """
+    Capturas ordenadas por fecha, opcionalmente dentro de un rango de fechas
+    (un hasta sin hora incluye todo ese día)
+    """
+    condiciones, parametros = _condiciones_fecha(desde, hasta)
+    donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    return con.execute(
+        f"SELECT * FROM capturas {donde} ORDER BY fecha_captura", parametros
+    ).fetchall()
@@ -0,0 +1,218 @@
+"""
+Modelo directo del circuito RL de la bobina en el dominio de la frecuencia
+
+La bobina de N vueltas y área A se modela como una fuente ε(t) = -N·A·dB/dt en
+serie con R y L:
+    L·dI/dt + R·I = ε(t)   →   Î(ω) = -N·A·iω·B̂(ω) / (R + iωL)
+
+La derivada y la función de transferencia se aplican juntas sobre la rFFT del B
+medido (rFFT → multiplicar → irFFT), en O(n log n) y sin integrar la EDO paso a
+paso. Varios pares (R, L) se evalúan con irFFT por lotes de PARES_POR_LOTE,
+para acotar la memoria de los espectros intermedios.
+
+El problema inverso (identificar R y L a partir de B e I medidos) usa la misma
+relación en las líneas espectrales de la rotación: ε̂ = (R + iωL)·Î es lineal
+en R y L, así que cada ventana se resuelve como un pequeño problema de mínimos
+cuadrados, y todas las ventanas de un registro en una sola pasada vectorizada.
+
+Laboratorio de Física - FEM
+"""
+
+import numpy as np
+from scipy import fft
+from scipy.stats import t as t_student
+from scipy.signal import get_window
+from numpy.lib.stride_tricks import sliding_window_view
+
+PARES_POR_LOTE = 64     # pares (R, L) por irFFT en simular_corriente_rl
+
+
+def area_bobina(r_bobina):
+    """Área de una espira circular de radio r_bobina (m²)"""
+    return np.pi * r_bobina**2
+
+
+def transferencia_rl(f, R, L):
+    """
+    Admitancia H(f) = 1 / (R + i·2πf·L) del circuito (A/V)
+    R y L se difunden (broadcast) contra f añadiendo un eje al final.
+    """
+    R = np.asarray(R, dtype=float)[..., np.newaxis]
+    L = np.asarray(L, dtype=float)[..., np.newaxis]
+    return 1.0 / (R + 2j * np.pi * f * L)
+
+
+def espectro_fem(B_mT, dt, N, r_bobina):
+    """
+    rFFT de la FEM inducida ε(t) = -N·A·dB/dt a partir del B medido (mT)
+
+    Para que la señal sea periódica sin saltos en los bordes se usa la extensión
+    par [B, B invertido] de largo 2n (la FFT supone periodicidad). B se convierte
+    a T y la derivada se aplica como multiplicación por i·2πf.
+    Retorna (f, ε̂) sobre la malla de la extensión.
+    """
+    B_T = np.asarray(B_mT, dtype=float) * 1e-3
+    B_T = B_T - B_T.mean(axis=-1, keepdims=True)
+    n = B_T.shape[-1]
+    extension = np.concatenate([B_T, B_T[..., ::-1]], axis=-1)
+
+    f = fft.rfftfreq(2 * n, dt)
+    B_hat = fft.rfft(extension, axis=-1, workers=-1)
+    eps_hat = -N * area_bobina(r_bobina) * 2j * np.pi * f * B_hat
+    return f, eps_hat
+
+
+def simular_corriente_rl(t, B_mT, N, r_bobina, R, L, f_max=None, pares_por_lote=PARES_POR_LOTE):
+    """
+    Corriente I(t) predicha por el circuito RL para el B(t) medido
+
+    t, B_mT: malla uniforme de tiempo (s) y campo medido (mT)
+    N, r_bobina: número de vueltas y radio de la bobina (m)
+    R, L: resistencia (Ω) e inductancia (H); escalares o arreglos del mismo
+          tamaño para simular varios circuitos a la vez
+    f_max: si se indica, se descartan las componentes sobre f_max (Hz), útil
+           porque derivar B amplifica el ruido de alta frecuencia del sensor.
+           Los espectros se guardan solo hasta f_max; la irFFT completa con ceros.
+    pares_por_lote: pares (R, L) que se transforman juntos en cada irFFT
+
+    B_mT es una sola señal de forma (len(t),).
+    Retorna I en A con forma np.broadcast(R, L).shape + (len(t),)
+    """
+    t = np.asarray(t, dtype=float)
+    n = t.size
+    dt = (t[-1] - t[0]) / (n - 1)
+
+    f, eps_hat = espectro_fem(B_mT, dt, N, r_bobina)
+    if f_max is not None:
+        n_bins = int(np.searchsorted(f, f_max, side='right'))
+        f, eps_hat = f[:n_bins], eps_hat[:n_bins]
+
+    R, L = np.broadcast_arrays(np.asarray(R, dtype=float), np.asarray(L, dtype=float))
+    R_pares, L_pares = R.ravel(), L.ravel()
+    I = np.empty((R_pares.size, n))
+    for i in range(0, R_pares.size, pares_por_lote):
+        lote = slice(i, i + pares_por_lote)
+        I_hat = eps_hat * transferencia_rl(f, R_pares[lote], L_pares[lote])
+        I[lote] = fft.irfft(I_hat, 2 * n, axis=-1, workers=-1)[:, :n]
+    return I.reshape(R.shape + (n,))
+
+
+def _identificar_lote(B_ventanas, I_ventanas, dt, N, r_bobina, f_rotacion,
+                      n_armonicos, semiancho_bins, nivel, polaridad):
+    """
+    Estima (R, L) para cada fila de B_ventanas / I_ventanas (forma (m, n))
+
+    En los bins de k·f_rotacion ± semiancho_bins (k = 1..n_armonicos):
+        s·ε̂_j = R·Î_j + L·(iω_j·Î_j)
+    Separando partes real e imaginaria quedan 2·bins ecuaciones reales lineales
+    en (R, L), resueltas por ecuaciones normales 2×2 apiladas por ventana.
+    """
+    m, n = B_ventanas.shape
+    ventana = get_window('hann', n)
+    f = fft.rfftfreq(n, dt)
+
+    # Índices de bins alrededor de cada armónico (sin DC ni sobre Nyquist)
+    df = f[1]
+    bins = []
+    for k in range(1, n_armonicos + 1):
+        centro = int(round(k * f_rotacion / df))
+        bins.extend(range(centro - semiancho_bins, centro + semiancho_bins + 1))
+    bins = np.array(sorted(b for b in set(bins) if 0 < b < len(f)))
+
+    # Transformadas de todas las ventanas en una llamada, solo en los bins útiles
+    B_T = (B_ventanas - B_ventanas.mean(axis=-1, keepdims=True)) * 1e-3
+    I_c = I_ventanas - I_ventanas.mean(axis=-1, keepdims=True)
+    B_hat = fft.rfft(B_T * ventana, axis=-1, workers=-1)[:, bins]
+    I_hat = fft.rfft(I_c * ventana, axis=-1, workers=-1)[:, bins]
+
+    w = 2 * np.pi * f[bins]
+    eps_hat = -N * area_bobina(r_bobina) * 1j * w * B_hat
+
+    if polaridad is None:
+        # Con R > 0 la parte real de ε̂·conj(Î) es positiva si la polaridad es +1
+        polaridad = np.sign(np.sum(np.real(eps_hat * np.conj(I_hat))))
+        polaridad = 1.0 if polaridad == 0 else polaridad
+    eps_hat = polaridad * eps_hat
+
+    # Matriz de diseño real (m, 2·bins, 2) y lado derecho (m, 2·bins)
+    col_R = I_hat
+    col_L = 1j * w * I_hat
+    A = np.stack([
+        np.concatenate([col_R.real, col_R.imag], axis=-1),
+        np.concatenate([col_L.real, col_L.imag], axis=-1),
+    ], axis=-1)
+    b = np.concatenate([eps_hat.real, eps_hat.imag], axis=-1)
+
+    AtA = np.einsum('mji,mjk->mik', A, A)
+    Atb = np.einsum('mji,mj->mi', A, b)
+    x = np.linalg.solve(AtA, Atb[..., np.newaxis])[..., 0]
+
+    residuos = b - np.einsum('mij,mj->mi', A, x)
+    gl = A.shape[1] - 2
+    if gl > 0:
+        sigma2 = np.sum(residuos**2, axis=-1) / gl
+        cov = sigma2[:, np.newaxis, np.newaxis] * np.linalg.inv(AtA)
+        errores = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+        semiancho_ic = t_student.ppf(0.5 + nivel / 2, gl) * errores
+    else:
+        errores = np.full_like(x, np.nan)
+        semiancho_ic = np.full_like(x, np.nan)
+
+    return {
+        'R': x[:, 0],
+        'L': x[:, 1],
+        'error_R': errores[:, 0],
+        'error_L': errores[:, 1],
+        'ic_R': semiancho_ic[:, 0],
+        'ic_L': semiancho_ic[:, 1],
+        'polaridad': polaridad,
+        'frecuencias': f[bins],
+    }
+
+
+def identificar_rl(t, B_mT, I, N, r_bobina, f_rotacion, n_armonicos=3,
+                   semiancho_bins=1, nivel=0.95, polaridad=None):
+    """
+    Identifica R (Ω) y L (H) de la función de transferencia entre dB/dt e I
+
+    Usa la rFFT (ventana de Hann) de todo el intervalo en f_rotacion y sus
+    armónicos. polaridad (±1) es el signo de conexión de la bobina; si es
+    None se estima de los datos. Retorna un diccionario con R, L, sus errores
+    estándar y semianchos de los intervalos de confianza al nivel indicado.
+    """
+    t = np.asarray(t, dtype=float)
+    dt = (t[-1] - t[0]) / (len(t) - 1)
+    r = _identificar_lote(np.atleast_2d(np.asarray(B_mT, dtype=float)),
+                          np.atleast_2d(np.asarray(I, dtype=float)),
+                          dt, N, r_bobina, f_rotacion, n_armonicos,
+                          semiancho_bins, nivel, polaridad)
+    for clave in ('R', 'L', 'error_R', 'error_L', 'ic_R', 'ic_L'):
+        r[clave] = r[clave][0]
+    return r
+
+
+def identificar_rl_por_ventanas(t, B_mT, I, N, r_bobina, f_rotacion, ancho, paso,
+                                n_armonicos=3, semiancho_bins=1, nivel=0.95,
+                                polaridad=None):
+    """
+    Identificación de R y L en ventanas deslizantes de todo el registro
+
+    ancho, paso: tamaño de la ventana y avance entre ventanas, en muestras
+    Todas las ventanas se transforman juntas y se resuelven en una sola pasada.
+    La polaridad se estima una vez para todo el registro si no se indica.
+    Retorna el mismo diccionario que identificar_rl, con un valor por ventana,
+    más 't_centro'.
+    """
+    t = np.asarray(t, dtype=float)
+    dt = (t[-1] - t[0]) / (len(t) - 1)
+
+    if polaridad is None:
+        polaridad = identificar_rl(t, B_mT, I, N, r_bobina, f_rotacion,
+                                   n_armonicos, semiancho_bins)['polaridad']
+
+    B_ventanas = sliding_window_view(np.asarray(B_mT, dtype=float), ancho)[::paso]
+    I_ventanas = sliding_window_view(np.asarray(I, dtype=float), ancho)[::paso]
+    r = _identificar_lote(B_ventanas, I_ventanas, dt, N, r_bobina, f_rotacion,
+                          n_armonicos, semiancho_bins, nivel, polaridad)
+    r['t_centro'] = sliding_window_view(t, ancho)[::paso].mean(axis=-1)
+    return r
@@ -0,0 +1,52 @@
+"""
+Script para consultar el historial de resultados del catálogo de corridas
+Responde solo con lo ya registrado en catalogo_corridas.sqlite, sin recalcular
+Laboratorio de Física - FEM
+"""
+
+import sys
+
+from catalogo_corridas import abrir_catalogo, resumen_por_captura, tendencia, tiempos_corrida
+
+print("="*70)
+print("HISTORIAL DE CORRIDAS (CATÁLOGO)")
+print("="*70)
+
+catalogo = abrir_catalogo()
+n_corridas = catalogo.execute("SELECT COUNT(*) FROM corridas").fetchone()[0]
+if n_corridas == 0:
+    print("\nEl catálogo está vacío: ejecute primero ajuste_curva_B.py,")
+    print("calcular_corriente_pico.py o calcular_corriente_faraday.py")
+    sys.exit(0)
+
+print(f"\n{n_corridas} corridas registradas\n")
+
+
+def formato(valor, patron, escala=1.0):
+    return patron.format(valor * escala) if valor is not None else '—'
+
+
+print(f"  {'Captura':<20} {'Archivo':<18} {'ω (rad/s)':>20} {'R²':>9} "
+      f"{'I_pico exp':>11} {'I_pico teo':>11} {'R_ef (Ω)':>9}")
+for fila in resumen_por_captura(catalogo):
+    omega = (f"{fila['omega']:.4f} ± {fila['error_omega']:.4f}"
+             if fila['omega'] is not None else '—')
+    print(f"  {fila['fecha_captura'] or '—':<20} {fila['archivo']:<18} {omega:>20} "
+          f"{formato(fila['R2'], '{:.5f}'):>9} "
+          f"{formato(fila['I_pico_exp'], '{:.3f} mA', 1000):>11} "
+          f"{formato(fila['I_pico_teo'], '{:.3f} mA', 1000):>11} "
+          f"{formato(fila['R_efectiva'], '{:.2f}'):>9}")
+
+print("\nTendencia de ω por fecha de captura (ajuste_curva_B):")
+for fecha, omega in tendencia(catalogo, 'omega', script='ajuste_curva_B'):
+    print(f"  {fecha}  ω = {omega:.6f} rad/s")
+
+print("\nTiempos por etapa de las últimas corridas:")
+for fila in catalogo.execute(
+        "SELECT id, script, fecha_analisis FROM corridas ORDER BY fecha_analisis DESC, id DESC LIMIT 5"):
+    tiempos = tiempos_corrida(catalogo, fila['id'])
+    if tiempos:
+        detalle = ', '.join(f"{etapa} {segundos*1000:.1f} ms" for etapa, segundos in tiempos.items())
+        print(f"  {fila['script']:<28} {detalle}")
+
+print("\n" + "="*70)
@@ -0,0 +1,118 @@
+"""
+Lectura de archivos Vernier Format 2 (exportados desde Logger Pro / Graphical Analysis)
+
+Un archivo puede contener varias series, cada una con su propio encabezado:
+    Vernier Format 2
+    Sin título.cmbl 13/11/2025 15:03:15 .
+    Último                         ← nombre de la serie
+    Tiempo  Campo magnético  Corriente
+    t       B                I
+    s       mT               A
+    (línea vacía)
+    datos separados por tabuladores...
+
+Laboratorio de Física - FEM
+"""
+
+import re
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+
+ENCABEZADO_VERNIER = 'Vernier Format 2'
+LINEAS_ENCABEZADO = 7
+
+
+_PATRON_FECHA = re.compile(r'^(.*?)\s+(\d{1,2}/\d{1,2}/\d{4})\s+(\d{1,2}:\d{2}:\d{2})')
+
+
+def interpretar_encabezado(lineas):
+    """Diccionario con los metadatos de las 7 líneas de encabezado de una serie"""
+    lineas = [linea.rstrip('\r\n') for linea in lineas]
+    archivo_cmbl, fecha_captura = None, None
+    coincidencia = _PATRON_FECHA.match(lineas[1])
+    if coincidencia:
+        archivo_cmbl = coincidencia.group(1)
+        fecha_captura = datetime.strptime(
+            f"{coincidencia.group(2)} {coincidencia.group(3)}", '%d/%m/%Y %H:%M:%S'
+        )
+    return {
+        'archivo_cmbl': archivo_cmbl,
+        'fecha_captura': fecha_captura,
+        'serie': lineas[2].strip(),
+        'columnas': lineas[3].split('\t'),
+        'simbolos': lineas[4].split('\t'),
+        'unidades': lineas[5].split('\t'),
+    }
+
+
+def leer_encabezado_vernier(ruta):
+    """
+    Metadatos de la primera serie de un archivo Vernier sin leer los datos
+    Retorna {'archivo_cmbl', 'fecha_captura' (datetime), 'serie', 'columnas',
+    'simbolos', 'unidades'}
+    """
+    with open(ruta, encoding='utf-8-sig') as f:
+        lineas = list(islice(f, LINEAS_ENCABEZADO))
+    if len(lineas) < LINEAS_ENCABEZADO or not lineas[0].startswith(ENCABEZADO_VERNIER):
+        raise ValueError(f"'{ruta}' no tiene encabezado {ENCABEZADO_VERNIER}")
+    return interpretar_encabezado(lineas)
+
+
+def es_linea_numerica(linea):
+    inicio = linea[:1]
+    return inicio != '' and (inicio.isdigit() or inicio in '-+.')
+
+
+def leer_series_vernier(ruta):
+    """
+    Lee todas las series de un archivo Vernier
+    Retorna una lista de diccionarios {'nombre', 'datos'} con datos de forma (n, columnas)
+    """
+    series = []
+    nombre = None
+    filas = []
+    with open(ruta, encoding='utf-8-sig') as f:
+        lineas = iter(f)
+        for linea in lineas:
+            if linea.startswith(ENCABEZADO_VERNIER):
+                if filas:
+                    series.append({'nombre': nombre, 'datos': np.loadtxt(filas, delimiter='\t', ndmin=2)})
+                next(lineas, None)                      # línea con archivo y fecha
+                nombre = next(lineas, '').strip()       # nombre de la serie
+                filas = []
+            elif es_linea_numerica(linea):
+                filas.append(linea)
+    if filas:
+        series.append({'nombre': nombre, 'datos': np.loadtxt(filas, delimiter='\t', ndmin=2)})
+    return series
+
+
+def leer_vernier_por_bloques(ruta, filas_por_bloque=65536):
+    """
+    Lee la primera serie de un archivo Vernier por bloques de filas
+
+    Generador que entrega arreglos de forma (m, columnas) con m <= filas_por_bloque,
+    de modo que registros arbitrariamente largos se procesan con memoria acotada.
+    Se detiene al encontrar el encabezado de la siguiente serie.
+    """
+    with open(ruta, encoding='utf-8-sig') as f:
+        for _ in range(LINEAS_ENCABEZADO):
+            next(f, None)
+        while True:
+            lineas = list(islice(f, filas_por_bloque))
+            if not lineas:
+                return
+            filas = []
+            fin_serie = False
+            for linea in lineas:
+                if linea.startswith(ENCABEZADO_VERNIER):
+                    fin_serie = True
+                    break
+                if es_linea_numerica(linea):
+                    filas.append(linea)
+            if filas:
+                yield np.loadtxt(filas, delimiter='\t', ndmin=2)
+            if fin_serie:
+                return
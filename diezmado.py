@@ -0,0 +1,189 @@
+"""
+Diezmado con filtro antialiasing (FIR de fase lineal, forma polifásica)
+
+El campo gira a ~8.6 Hz pero se muestrea a 1 kHz, así que los ajustes procesan
+muchas más muestras de las que la señal necesita. Aquí se filtra pasa-bajos y se
+conserva 1 de cada `factor` muestras, calculando el FIR solo en las muestras que
+se conservan (equivalente a la implementación polifásica: ntaps productos por
+muestra de salida, ntaps/factor por muestra de entrada).
+
+El filtro es simétrico y centrado, con retardo D = (ntaps - 1)/2 múltiplo del
+factor: cada muestra de salida corresponde exactamente a una muestra de entrada
+y conserva su marca de tiempo original. Se pierden D muestras en cada extremo
+(las que no tienen la ventana completa del filtro).
+
+DiezmadorFIR procesa registros por bloques (streaming) con el mismo resultado
+que procesar el registro completo de una vez. diezmar_intervalo filtra solo un
+intervalo de ajuste (más D muestras a cada lado), no el registro entero.
+
+Laboratorio de Física - FEM
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import firwin
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Con corte en la nueva Nyquist y 16 tramos por factor, la ventana de Kaiser
+# (β = 8) da banda de paso plana (< 0.001 dB) hasta 0.8·Nyquist y más de 80 dB
+# de atenuación desde 1.2·Nyquist: lo que se pliega sobre [0, 0.8·Nyquist] queda
+# suprimido, y solo la franja 0.8-1.0·Nyquist (fuera de la banda útil) recibe alias.
+TAPS_POR_FACTOR = 16    # semiancho del filtro en múltiplos del factor
+FRACCION_CORTE = 1.0    # corte (-6 dB) relativo a la nueva frecuencia de Nyquist
+
+
+def factor_automatico(fs, f_max, margen=1.25, n_intervalo=None):
+    """
+    Mayor factor de diezmado que conserva sin atenuar hasta f_max (Hz)
+
+    La nueva frecuencia de Nyquist fs/(2·factor) debe ser al menos margen·f_max,
+    para que f_max caiga en la banda plana del filtro (hasta 0.8·Nyquist).
+
+    n_intervalo: pasos de muestreo del intervalo de ajuste (muestras - 1). Si se
+    da, el factor se reduce al mayor divisor de n_intervalo, para que la malla
+    diezmada llegue exactamente al final del intervalo: con otro factor el
+    ajuste pierde hasta factor - 1 muestras del final y, como la rotación no
+    es estacionaria, ω se corre más de una desviación estándar.
+    """
+    factor = max(1, int(fs // (2 * margen * f_max)))
+    if n_intervalo is not None:
+        while n_intervalo % factor:
+            factor -= 1
+    return factor
+
+
+def armonicos_conservados(fs, factor, f_fundamental, margen=1.25):
+    """
+    Número de armónicos de f_fundamental (Hz) que quedan en la banda plana del
+    filtro tras diezmar por factor: k·f_fundamental <= fs/(2·margen·factor)
+    Los de arriba se atenúan o se pliegan y no deben ofrecerse a un ajuste.
+    """
+    return int(fs / (2 * margen * factor) // f_fundamental)
+
+
+def disenar_filtro(factor, taps_por_factor=TAPS_POR_FACTOR, fraccion_corte=FRACCION_CORTE):
+    """
+    Coeficientes del FIR antialiasing (ventana de Kaiser, ganancia unitaria en DC)
+    ntaps = 2·taps_por_factor·factor + 1, de modo que el retardo es múltiplo del factor
+    """
+    ntaps = 2 * taps_por_factor * factor + 1
+    return firwin(ntaps, fraccion_corte / factor, window=('kaiser', 8.0))
+
+
+@lru_cache(maxsize=32)
+def _filtro_invertido(factor, taps_por_factor, fraccion_corte):
+    """
+    Coeficientes en orden inverso, listos para el producto con las ventanas
+    El diseño (firwin) cuesta más que filtrar un intervalo de ajuste, así que
+    se guarda por factor; el arreglo es de solo lectura porque se comparte.
+    """
+    h = disenar_filtro(factor, taps_por_factor, fraccion_corte)[::-1].copy()
+    h.flags.writeable = False
+    return h
+
+
+class DiezmadorFIR:
+    """
+    Filtro antialiasing + diezmado por bloques
+
+    d = DiezmadorFIR(factor)
+    for t_bloque, x_bloque in bloques:
+        t_d, x_d = d.procesar(t_bloque, x_bloque)   # x de forma (..., m)
+
+    Las salidas se alinean a los índices de entrada múltiplos de `factor`
+    (contados desde la primera muestra procesada).
+    """
+
+    __slots__ = ('factor', 'h', 'retardo', '_t', '_x', '_inicio', '_siguiente')
+
+    def __init__(self, factor, taps_por_factor=TAPS_POR_FACTOR, fraccion_corte=FRACCION_CORTE):
+        self.factor = int(factor)
+        self.h = _filtro_invertido(self.factor, taps_por_factor, fraccion_corte)
+        self.retardo = (len(self.h) - 1) // 2
+        self._t = None
+        self._x = None
+        self._inicio = 0                  # índice absoluto de la primera muestra en el búfer
+        self._siguiente = self.retardo    # índice absoluto de la próxima muestra de salida
+
+    def procesar(self, t, x):
+        """
+        Agrega un bloque (t de forma (m,), x de forma (..., m)) y retorna las
+        muestras diezmadas que ya tienen completa la ventana del filtro
+        """
+        t = np.asarray(t, dtype=float)
+        x = np.asarray(x, dtype=float)
+        if self._t is None:
+            self._t, self._x = t, x
+        else:
+            self._t = np.concatenate([self._t, t])
+            self._x = np.concatenate([self._x, x], axis=-1)
+
+        ntaps = len(self.h)
+        n_buffer = self._t.size
+        primera_ventana = self._siguiente - self.retardo - self._inicio
+        n_salidas = max(0, (n_buffer - ntaps - primera_ventana) // self.factor + 1)
+
+        if n_salidas == 0:
+            return self._t[:0], self._x[..., :0]
+
+        fin = primera_ventana + (n_salidas - 1) * self.factor + 1
+        ventanas = sliding_window_view(self._x, ntaps, axis=-1)[..., primera_ventana:fin:self.factor, :]
+        x_d = ventanas @ self.h
+        centros = np.arange(primera_ventana, fin, self.factor) + self.retardo
+        t_d = self._t[centros]
+
+        # Conservar solo lo necesario para la próxima ventana
+        self._siguiente += n_salidas * self.factor
+        descartar = self._siguiente - self.retardo - self._inicio
+        self._t = self._t[descartar:].copy()
+        self._x = self._x[..., descartar:].copy()
+        self._inicio += descartar
+        return t_d, x_d
+
+
+def diezmar(t, x, factor, taps_por_factor=TAPS_POR_FACTOR):
+    """
+    Diezma un registro completo; x puede tener varios canales (..., n)
+    Retorna (t_diezmado, x_diezmado) con marcas de tiempo exactas de la malla original
+    """
+    if factor <= 1:
+        return np.asarray(t, dtype=float), np.asarray(x, dtype=float)
+    return DiezmadorFIR(factor, taps_por_factor).procesar(t, x)
+
+
+def diezmar_intervalo(t, x, factor, t_inicio, t_fin, taps_por_factor=TAPS_POR_FACTOR):
+    """
+    Diezma solo las muestras con t_inicio <= t <= t_fin
+    Se filtran además las D = taps_por_factor·factor muestras de cada lado que
+    necesita el filtro (las que existan), y la malla diezmada empieza en la
+    primera muestra del intervalo. Retorna (t_diezmado, x_diezmado) dentro del intervalo.
+    """
+    t = np.asarray(t, dtype=float)
+    i0 = int(np.searchsorted(t, t_inicio, side='left'))
+    i1 = int(np.searchsorted(t, t_fin, side='right'))
+    if factor <= 1:
+        return t[i0:i1], np.asarray(x, dtype=float)[..., i0:i1]
+
+    retardo = taps_por_factor * factor
+    # Si falta borde al inicio, la primera salida se corre al primer índice
+    # alineado con el intervalo que tiene la ventana completa
+    inicio = i0 - retardo
+    if inicio < 0:
+        inicio += -(-(-inicio) // factor) * factor
+    t_d, x_d = DiezmadorFIR(factor, taps_por_factor).procesar(
+        t[inicio:i1 + retardo], np.asarray(x)[..., inicio:i1 + retardo]
+    )
+    dentro = t_d <= t[i1 - 1]
+    return t_d[dentro], x_d[..., dentro]
+
+
+def diezmar_por_bloques(bloques, factor, taps_por_factor=TAPS_POR_FACTOR):
+    """
+    Generador que diezma un iterable de bloques (t, x) con memoria acotada
+    """
+    diezmador = DiezmadorFIR(factor, taps_por_factor)
+    for t, x in bloques:
+        t_d, x_d = diezmador.procesar(t, x)
+        if t_d.size:
+            yield t_d, x_d
@@ -0,0 +1,122 @@
+"""
+Escaneo rápido de archivos Vernier Format 2 leyendo solo el encabezado
+
+Por archivo se leen las 7 líneas de encabezado y las dos primeras filas de datos,
+y con seek se lee la cola del archivo para obtener la última fila. Con eso se
+derivan frecuencia de muestreo, duración y número de filas sin interpretar el
+cuerpo numérico. Un directorio completo se escanea en paralelo con un pool de
+hilos (el trabajo es casi todo E/S).
+
+Laboratorio de Física - FEM
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from datos_vernier import (ENCABEZADO_VERNIER, LINEAS_ENCABEZADO,
+                           interpretar_encabezado, es_linea_numerica)
+
+BYTES_COLA = 4096
+
+
+def _primer_valor(linea):
+    return float(linea.split('\t', 1)[0])
+
+
+def escanear_vernier(ruta, bytes_cola=BYTES_COLA):
+    """
+    Metadatos de un archivo Vernier sin leer el cuerpo de datos
+
+    Retorna un diccionario con los campos del encabezado (ver
+    leer_encabezado_vernier) más ruta, tamano, mtime, t_inicial, t_final, fs,
+    duracion y n_filas. n_filas se deriva de la primera y la última fila
+    suponiendo muestreo uniforme; si el tamaño del archivo indica bastante más
+    filas de las que cubre ese intervalo (p. ej. varias series en el mismo
+    archivo) se marca 'varias_series'.
+    Lanza ValueError si el archivo no es Vernier Format 2.
+    """
+    estado = os.stat(ruta)
+    tamano = estado.st_size
+
+    with open(ruta, 'rb') as f:
+        crudas = [f.readline() for _ in range(LINEAS_ENCABEZADO + 2)]
+        lineas = [linea.decode('utf-8-sig' if i == 0 else 'utf-8', errors='replace')
+                  for i, linea in enumerate(crudas)]
+        if not lineas[0].startswith(ENCABEZADO_VERNIER):
+            raise ValueError(f"'{ruta}' no tiene encabezado {ENCABEZADO_VERNIER}")
+
+        primera, segunda = lineas[LINEAS_ENCABEZADO], lineas[LINEAS_ENCABEZADO + 1]
+        if not (es_linea_numerica(primera) and es_linea_numerica(segunda)):
+            raise ValueError(f"'{ruta}' no tiene al menos dos filas de datos")
+
+        f.seek(max(tamano - bytes_cola, 0))
+        cola = f.read().decode('utf-8', errors='replace').splitlines()
+
+    # La primera línea de la cola puede estar cortada: se descarta salvo que sea todo el archivo
+    if tamano > bytes_cola:
+        cola = cola[1:]
+    ultima = next((linea for linea in reversed(cola) if es_linea_numerica(linea)), segunda)
+
+    t_inicial = _primer_valor(primera)
+    dt = _primer_valor(segunda) - t_inicial
+    t_final = _primer_valor(ultima)
+    n_filas = int(round((t_final - t_inicial) / dt)) + 1 if dt > 0 else 1
+
+    # Estimación independiente por tamaño: bytes de datos / largo típico de fila
+    bytes_encabezado = sum(len(linea) for linea in crudas[:LINEAS_ENCABEZADO])
+    largo_fila = (len(crudas[LINEAS_ENCABEZADO]) + len(crudas[LINEAS_ENCABEZADO + 1])) / 2
+    n_filas_por_tamano = (tamano - bytes_encabezado) / largo_fila
+
+    resultado = interpretar_encabezado(lineas[:LINEAS_ENCABEZADO])
+    resultado.update({
+        'ruta': str(ruta),
+        'tamano': tamano,
+        'mtime': estado.st_mtime,
+        't_inicial': t_inicial,
+        't_final': t_final,
+        'fs': 1 / dt if dt > 0 else None,
+        'duracion': t_final - t_inicial,
+        'n_filas': n_filas,
+        'varias_series': n_filas_por_tamano > 1.5 * n_filas,
+    })
+    return resultado
+
+
+def _escanear_seguro(ruta):
+    try:
+        return escanear_vernier(ruta), None
+    except (OSError, ValueError, IndexError) as e:
+        return None, (str(ruta), str(e))
+
+
+def escanear_directorio(raiz, patron='*.txt', hilos=16, omitir=None):
+    """
+    Escanea en paralelo todos los archivos Vernier bajo raiz (recursivo)
+
+    patron: filtro de nombres (glob)
+    omitir: diccionario {ruta: (tamano, mtime)} de archivos ya catalogados;
+            los que no cambiaron no se vuelven a leer
+    Retorna (capturas, errores): lista de diccionarios de escanear_vernier y
+    lista de (ruta, motivo) de los archivos que no son Vernier o no se pudieron leer.
+    """
+    omitir = omitir or {}
+    rutas = []
+    for ruta in Path(raiz).rglob(patron):
+        if not ruta.is_file():
+            continue
+        previo = omitir.get(str(ruta))
+        if previo is not None:
+            estado = ruta.stat()
+            if previo == (estado.st_size, estado.st_mtime):
+                continue
+        rutas.append(ruta)
+
+    capturas, errores = [], []
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        for captura, error in pool.map(_escanear_seguro, rutas):
+            if captura is not None:
+                capturas.append(captura)
+            else:
+                errores.append(error)
+    return capturas, errores
@@ -0,0 +1,174 @@
+"""
+Densidad espectral de potencia (método de Welch) y caracterización de ruido
+de los canales B e I
+
+- psd_welch_streaming: acumula periodogramas de segmentos bloque a bloque,
+  con memoria acotada (un bloque + un segmento), para registros de cualquier largo
+- psd_welch_lote: varias corridas (de distinto largo) en una sola rFFT vectorizada
+- caracterizar_canal: piso de ruido, SNR en la frecuencia de rotación,
+  armónicos de rotación y componentes de la red eléctrica (50/60 Hz)
+
+Laboratorio de Física - FEM
+"""
+
+import numpy as np
+from scipy import fft
+from scipy.signal import get_window
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _parametros_welch(fs, nperseg, solape):
+    ventana = get_window('hann', nperseg)
+    paso = max(1, int(round(nperseg * (1 - solape))))
+    # Escala de densidad unilateral: 2·|X|² / (fs·Σw²)
+    escala = np.full(nperseg // 2 + 1, 2.0 / (fs * np.sum(ventana**2)))
+    escala[0] /= 2
+    if nperseg % 2 == 0:
+        escala[-1] /= 2
+    return ventana, paso, escala
+
+
+def _periodogramas(segmentos, ventana):
+    """|rFFT|² de cada segmento (último eje), sin media y con ventana"""
+    segmentos = segmentos - segmentos.mean(axis=-1, keepdims=True)
+    X = fft.rfft(segmentos * ventana, axis=-1, workers=-1)
+    return X.real**2 + X.imag**2
+
+
+def psd_welch_streaming(bloques, fs, nperseg=1024, solape=0.5):
+    """
+    PSD de Welch acumulada sobre un iterable de bloques de forma (canales, m)
+
+    Los segmentos que cruzan el borde entre bloques se completan con el resto
+    del bloque anterior, así que el resultado es idéntico al de procesar el
+    registro completo. Retorna (f, psd de forma (canales, nperseg//2 + 1), n_segmentos).
+    """
+    ventana, paso, escala = _parametros_welch(fs, nperseg, solape)
+    resto = None
+    acumulado = 0.0
+    n_segmentos = 0
+
+    for bloque in bloques:
+        bloque = np.atleast_2d(np.asarray(bloque, dtype=float))
+        buffer = bloque if resto is None else np.concatenate([resto, bloque], axis=-1)
+        m = buffer.shape[-1]
+        if m < nperseg:
+            resto = buffer
+            continue
+        k = (m - nperseg) // paso + 1
+        segmentos = sliding_window_view(buffer, nperseg, axis=-1)[:, :k * paso:paso]
+        acumulado = acumulado + _periodogramas(segmentos, ventana).sum(axis=-2)
+        n_segmentos += k
+        resto = buffer[:, k * paso:].copy()
+
+    if n_segmentos == 0:
+        raise ValueError(f"El registro es más corto que un segmento ({nperseg} muestras)")
+
+    f = fft.rfftfreq(nperseg, 1 / fs)
+    return f, acumulado / n_segmentos * escala, n_segmentos
+
+
+def psd_welch_lote(corridas, fs, nperseg=1024, solape=0.5):
+    """
+    PSD de Welch de varias corridas con una sola llamada a rFFT
+
+    corridas: lista de arreglos (canales, n_i); el largo n_i puede variar
+    Los segmentos de todas las corridas se apilan en una matriz, se transforman
+    juntos y se promedian por corrida con np.add.reduceat.
+    Retorna (f, psd de forma (corridas, canales, nperseg//2 + 1)).
+    """
+    ventana, paso, escala = _parametros_welch(fs, nperseg, solape)
+
+    segmentos = []
+    inicios = []
+    total = 0
+    for x in corridas:
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        if x.shape[-1] < nperseg:
+            raise ValueError(f"Una corrida es más corta que un segmento ({nperseg} muestras)")
+        s = sliding_window_view(x, nperseg, axis=-1)[:, ::paso]  # (canales, k, nperseg)
+        segmentos.append(np.moveaxis(s, 0, 1))                   # (k, canales, nperseg)
+        inicios.append(total)
+        total += s.shape[1]
+
+    P = _periodogramas(np.concatenate(segmentos, axis=0), ventana)
+    conteos = np.diff(inicios + [total])
+    psd = np.add.reduceat(P, inicios, axis=0) / conteos[:, np.newaxis, np.newaxis]
+
+    return fft.rfftfreq(nperseg, 1 / fs), psd * escala
+
+
+def potencia_linea(f, psd, f0, semiancho_bins=2):
+    """
+    Potencia integrada de una línea espectral en f0 (suma de ±semiancho_bins bins)
+    La ventana de Hann reparte una línea en ~3 bins, de ahí el valor por defecto.
+    """
+    df = f[1] - f[0]
+    i = int(round(f0 / df))
+    lo, hi = max(i - semiancho_bins, 0), min(i + semiancho_bins + 1, len(f))
+    return np.sum(psd[..., lo:hi], axis=-1) * df, f[min(i, len(f) - 1)]
+
+
+def frecuencia_pico(f, psd, f_min=1.0):
+    """
+    Frecuencia (Hz) de la línea más intensa de la PSD sobre f_min
+    Se refina por interpolación parabólica del logaritmo de los tres bins
+    alrededor del máximo (una línea con ventana de Hann es casi gaussiana).
+    """
+    inicio = int(np.searchsorted(f, f_min))
+    i = inicio + int(np.argmax(psd[inicio:]))
+    if i == 0 or i == len(f) - 1:
+        return f[i]
+    y0, y1, y2 = np.log(psd[i - 1:i + 2])
+    curvatura = y0 - 2 * y1 + y2
+    delta = 0.5 * (y0 - y2) / curvatura if curvatura < 0 else 0.0
+    return f[i] + np.clip(delta, -0.5, 0.5) * (f[1] - f[0])
+
+
+def caracterizar_canal(f, psd, f_rotacion, frecuencias_red=(50.0, 60.0),
+                       n_armonicos=5, semiancho_bins=2):
+    """
+    Caracteriza el ruido de un canal a partir de su PSD
+
+    - piso: mediana de la PSD (robusta frente a las líneas) en unidades²/Hz
+    - snr_dB: potencia de la línea en f_rotacion frente al ruido en toda la banda
+    - armonicos: potencia de k·f_rotacion, k = 1..n_armonicos
+    - red: por cada frecuencia de red y sus armónicos bajo Nyquist, la potencia
+      de la línea y su prominencia sobre el piso (dB)
+    """
+    df = f[1] - f[0]
+    ancho_linea = (2 * semiancho_bins + 1) * df
+    piso = np.median(psd[1:])
+    potencia_ruido = piso * (f[-1] - f[0])
+
+    armonicos = []
+    for k in range(1, n_armonicos + 1):
+        if k * f_rotacion >= f[-1]:
+            break
+        P, f_bin = potencia_linea(f, psd, k * f_rotacion, semiancho_bins)
+        armonicos.append({'k': k, 'f': f_bin, 'potencia': P})
+
+    red = []
+    for f_red in frecuencias_red:
+        h = 1
+        while h * f_red < f[-1]:
+            P, f_bin = potencia_linea(f, psd, h * f_red, semiancho_bins)
+            red.append({
+                'f_red': f_red,
+                'h': h,
+                'f': f_bin,
+                'potencia': P,
+                'prominencia_dB': 10 * np.log10(P / (piso * ancho_linea)),
+            })
+            h += 1
+
+    P_rot = armonicos[0]['potencia'] if armonicos else np.nan
+    return {
+        'piso': piso,
+        'densidad_ruido': np.sqrt(piso),
+        'ruido_rms': np.sqrt(potencia_ruido),
+        'potencia_rotacion': P_rot,
+        'snr_dB': 10 * np.log10(P_rot / potencia_ruido),
+        'armonicos': armonicos,
+        'red': red,
+    }
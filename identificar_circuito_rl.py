@@ -0,0 +1,134 @@
+"""
+Script para identificar la resistencia R y la inductancia L del circuito de la
+bobina a partir de B(t) e I(t) medidos (forma de onda completa, no solo picos)
+
+Ley de Faraday + circuito RL:  ε̂(ω) = -N·A·iω·B̂(ω) = (R + iωL)·Î(ω)
+evaluado en la frecuencia de rotación y sus armónicos
+
+Laboratorio de Física - FEM
+"""
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend sin GUI
+import matplotlib.pyplot as plt
+
+from circuito_rl import identificar_rl, identificar_rl_por_ventanas
+from modelo_armonico import ajustar_modelo_armonico, omega_espectral
+from catalogo_corridas import abrir_catalogo, hash_archivo, buscar_corrida
+from parametros_bobina import N, r_bobina, A_bobina
+
+# ============================================================================
+# PARÁMETROS DEL EXPERIMENTO
+# ============================================================================
+
+# N, r_bobina y A_bobina: parametros_bobina.py
+archivo_datos = 'datafinal.txt'
+n_armonicos = 3      # fundamental + 2 armónicos
+ancho_ventana = 1.0  # s
+paso_ventana = 0.25  # s
+
+# ============================================================================
+# CARGAR DATOS EXPERIMENTALES
+# ============================================================================
+
+data = np.loadtxt(archivo_datos, skiprows=7, delimiter='\t')
+t_all = data[:, 0]
+B_all = data[:, 1]
+I_all = data[:, 2]
+dt = t_all[1] - t_all[0]
+mask = (t_all >= 3.0) & (t_all <= 4.0)
+
+# Frecuencia de rotación de esta captura: ω del ajuste catalogado por
+# ajuste_curva_B.py o, si no hay, ajuste senoidal de B en 3.0 - 4.0 s
+ajuste_B = buscar_corrida(abrir_catalogo(), 'ajuste_curva_B', hash_archivo(archivo_datos), 3.0, 4.0)
+if ajuste_B is not None:
+    omega = ajuste_B['omega']
+    origen_omega = f"catálogo, ajuste_curva_B del {ajuste_B['fecha_analisis']}"
+else:
+    omega = ajustar_modelo_armonico(t_all[mask], B_all[mask],
+                                    omega_espectral(t_all[mask], B_all[mask]), K_max=1)['omega']
+    origen_omega = "ajuste senoidal de B en 3.0 - 4.0 s"
+f_rotacion = omega / (2 * np.pi)
+
+print("="*70)
+print("IDENTIFICACIÓN DE R Y L DEL CIRCUITO A PARTIR DE B(t) E I(t)")
+print("="*70)
+print(f"\n  N = {N} vueltas, A = {A_bobina:.6f} m², f_rot = {f_rotacion:.4f} Hz ({origen_omega})")
+print(f"  Líneas usadas: k·f_rot, k = 1..{n_armonicos} (±1 bin)")
+
+# ============================================================================
+# INTERVALO DEL AJUSTE (3.0 - 4.0 s)
+# ============================================================================
+
+r = identificar_rl(t_all[mask], B_all[mask], I_all[mask], N, r_bobina,
+                   f_rotacion, n_armonicos)
+
+# Estimación anterior (calcular_corriente_pico.py): solo dos valores pico
+B_pico_T = (B_all[mask].max() - B_all[mask].min()) / 2 * 1e-3
+I_pico_exp = (I_all[mask].max() - I_all[mask].min()) / 2
+R_efectiva = N * B_pico_T * A_bobina * omega / I_pico_exp
+
+print("\nIntervalo 3.0 - 4.0 s:")
+print(f"  Polaridad de la bobina: {r['polaridad']:+.0f}")
+print(f"  R = {r['R']:.3f} ± {r['ic_R']:.3f} Ω   (IC 95%)")
+print(f"  L = {r['L']*1000:.2f} ± {r['ic_L']*1000:.2f} mH  (IC 95%)")
+print(f"  R_efectiva por picos (calcular_corriente_pico.py) = {R_efectiva:.3f} Ω")
+
+# ============================================================================
+# SEGUIMIENTO EN VENTANAS DE TODO EL REGISTRO
+# ============================================================================
+
+rv = identificar_rl_por_ventanas(
+    t_all, B_all, I_all, N, r_bobina, f_rotacion,
+    int(round(ancho_ventana / dt)), int(round(paso_ventana / dt)),
+    n_armonicos, polaridad=r['polaridad']
+)
+t_v = rv['t_centro']
+
+# Deriva de R (calentamiento de la bobina): recta ponderada por 1/error²
+pesos = 1 / np.maximum(rv['error_R'], 1e-12)
+(deriva_R, R_0), cov_deriva = np.polyfit(t_v, rv['R'], 1, w=pesos, cov='unscaled')
+
+print(f"\n{len(t_v)} ventanas de {ancho_ventana:.2f} s cada {paso_ventana:.2f} s:")
+print(f"  R medio = {rv['R'].mean():.3f} Ω (min {rv['R'].min():.3f}, max {rv['R'].max():.3f})")
+print(f"  L medio = {rv['L'].mean()*1000:.2f} mH")
+print(f"  Deriva de R = {deriva_R*1000:.2f} ± {np.sqrt(cov_deriva[0, 0])*1000:.2f} mΩ/s")
+
+# ============================================================================
+# GRAFICAR
+# ============================================================================
+
+print("\nGenerando gráficas...")
+
+fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 9), sharex=True)
+
+ax1.errorbar(t_v, rv['R'], yerr=rv['ic_R'], fmt='bo', markersize=4, capsize=3,
+             label='R por ventana (IC 95%)')
+ax1.plot(t_v, R_0 + deriva_R * t_v, 'r-', linewidth=2,
+         label=f'Deriva: {deriva_R*1000:.2f} mΩ/s')
+ax1.axhline(y=R_efectiva, color='gray', linestyle='--', linewidth=1.5,
+            label=f'$R_{{efectiva}}$ por picos = {R_efectiva:.2f} Ω')
+ax1.set_ylabel('R (Ω)', fontsize=12, fontweight='bold')
+ax1.set_title('Identificación de R y L del circuito en ventanas deslizantes',
+              fontsize=14, fontweight='bold')
+ax1.grid(True, alpha=0.3, linestyle='--')
+ax1.legend(fontsize=10)
+
+ax2.errorbar(t_v, rv['L'] * 1000, yerr=rv['ic_L'] * 1000, fmt='go', markersize=4,
+             capsize=3, label='L por ventana (IC 95%)')
+ax2.axhline(y=0, color='k', linestyle='-', linewidth=0.8)
+ax2.set_xlabel('Tiempo (s)', fontsize=12, fontweight='bold')
+ax2.set_ylabel('L (mH)', fontsize=12, fontweight='bold')
+ax2.grid(True, alpha=0.3, linestyle='--')
+ax2.legend(fontsize=10)
+
+plt.tight_layout()
+
+nombre_archivo = 'identificacion_rl.png'
+plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+print(f"✓ Gráfica guardada como '{nombre_archivo}'")
+
+print("\n" + "="*70)
+print("✓ PROCESO COMPLETADO")
+print("="*70)
@@ -0,0 +1,325 @@
+"""
+Modelo multiarmónico del campo magnético con una frecuencia fundamental común
+Forma de la ecuación: B_fit(t) = D + Σ_k [a_k·sin(k·ω·t) + b_k·cos(k·ω·t)],  k = 1..K
+
+Para un ω dado el modelo es lineal en sus 2K+1 coeficientes, así que todos se
+resuelven con una sola factorización QR. Como las columnas de la matriz de diseño
+están anidadas (K armónicos ⊂ K+1 armónicos), esa misma QR da el residuo de cada
+K posible y el número de armónicos se elige por criterio de información (BIC/AIC).
+La única búsqueda no lineal es unidimensional, sobre ω.
+
+ModeloSenoidal guarda los parámetros ajustados y evalúa B, dB/dt, ∫B dt y la
+corriente de Faraday reutilizando los términos sin(kωt), cos(kωt) de cada malla
+de tiempo (caché LRU compartida entre instancias con el mismo ω y K, acotada por
+el total de bytes de las matrices guardadas).
+
+Laboratorio de Física - FEM
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from scipy.optimize import minimize_scalar
+
+LIMITE_CACHE_BYTES = 64 * 2**20   # 64 MiB; una matriz más grande no se guarda
+
+
+def matriz_armonica(t, omega, K):
+    """
+    Matriz de diseño del modelo armónico, de forma (len(t), 2K+1)
+    Columnas: [1, sin(ωt), cos(ωt), sin(2ωt), cos(2ωt), ..., sin(Kωt), cos(Kωt)]
+
+    Los armónicos se obtienen como potencias de exp(iωt) (producto acumulado),
+    de modo que solo se evalúa una exponencial compleja por muestra.
+    """
+    t = np.asarray(t, dtype=float)
+    z = np.exp(1j * omega * t)
+    potencias = np.cumprod(np.broadcast_to(z, (K, t.size)), axis=0)  # z^k, k = 1..K
+
+    X = np.empty((t.size, 2 * K + 1))
+    X[:, 0] = 1.0
+    X[:, 1::2] = potencias.imag.T   # sin(kωt)
+    X[:, 2::2] = potencias.real.T   # cos(kωt)
+    return X
+
+
+def _residuos_anidados(t, y, omega, K_max):
+    """
+    Factoriza X(ω, K_max) una sola vez y devuelve (Q^T·y, R, ss_res)
+    donde ss_res[k-1] es la suma de residuos al cuadrado usando k armónicos.
+    """
+    X = matriz_armonica(t, omega, K_max)
+    Q, R = np.linalg.qr(X)
+    c = Q.T @ y
+    ss_total = y @ y
+    ss_acumulada = np.cumsum(c**2)
+    ss_res = ss_total - ss_acumulada[2::2]  # columnas 3, 5, ..., 2K_max+1
+    return c, R, np.maximum(ss_res, 0.0)
+
+
+def criterio_informacion(ss_res, n, p, criterio='bic'):
+    """
+    Criterio de información para residuos gaussianos
+    n: número de puntos, p: número de parámetros libres
+    """
+    if criterio == 'bic':
+        return n * np.log(ss_res / n) + p * np.log(n)
+    if criterio == 'aic':
+        return n * np.log(ss_res / n) + 2 * p
+    raise ValueError(f"Criterio desconocido: '{criterio}' (use 'bic' o 'aic')")
+
+
+def evaluar_modelo_armonico(t, omega, coef):
+    """
+    Evalúa B_fit(t) para los coeficientes [D, a_1, b_1, ..., a_K, b_K]
+    """
+    return ModeloSenoidal(omega, coef).valor(t, memorizar=False)
+
+
+def derivada_modelo_armonico(t, omega, coef):
+    """
+    Derivada analítica dB_fit/dt = Σ_k k·ω·[a_k·cos(kωt) - b_k·sin(kωt)]
+    """
+    return ModeloSenoidal(omega, coef).derivada(t, memorizar=False)
+
+
+def amplitudes_fases(coef):
+    """
+    Convierte a_k·sin(kωt) + b_k·cos(kωt) en A_k·sin(kωt + C_k)
+    Retorna (D, A_k, C_k)
+    """
+    a = np.asarray(coef[1::2])
+    b = np.asarray(coef[2::2])
+    return coef[0], np.hypot(a, b), np.arctan2(b, a)
+
+
+def omega_espectral(t, y):
+    """
+    ω inicial (rad/s) a partir del pico del espectro de y (sin el bin de DC)
+    Su error es de hasta medio bin (π/T), el margen que cubre el refinamiento
+    de ajustar_modelo_armonico.
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    dt = (t[-1] - t[0]) / (len(t) - 1)
+    espectro = np.abs(np.fft.rfft(y - y.mean()))
+    return 2 * np.pi * np.fft.rfftfreq(len(y), dt)[np.argmax(espectro[1:]) + 1]
+
+
+def ajustar_modelo_armonico(t, y, omega_inicial, K_max=8, criterio='bic'):
+    """
+    Ajusta el modelo multiarmónico a los datos (t, y)
+
+    1. Se refina ω con una búsqueda acotada en ±medio bin de FFT alrededor de
+       omega_inicial, usando el perfil de residuos con un armónico; cada
+       evaluación es un único problema lineal de mínimos cuadrados.
+    2. Con ese ω, una QR de la matriz con K_max armónicos da el residuo de
+       todos los K y se elige el que minimiza el criterio. K_max se limita a
+       los armónicos bajo la frecuencia de Nyquist (k·ω < π/dt): los de arriba
+       se pliegan sobre frecuencias más bajas y no son independientes.
+    3. Si K > 1 se vuelve a refinar ω con K armónicos y se repite la
+       selección una vez; si K cambia, se refina ω con el nuevo K.
+    4. Se resuelven los 2K+1 coeficientes y se estiman sus errores a partir
+       del jacobiano completo (incluido ∂B/∂ω).
+
+    Retorna un diccionario con omega, coef, K, errores (ω primero, luego los
+    coeficientes), R2, rms y la tabla del criterio por K (en el ω final).
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = t.size
+    dt = (t[-1] - t[0]) / (n - 1)
+    K_nyquist = int(np.ceil(np.pi / (omega_inicial * dt))) - 1
+    K_max = int(min(K_max, (n - 2) // 2, K_nyquist))
+    if K_max < 1:
+        raise ValueError("Se necesitan al menos 4 puntos y ω bajo la frecuencia de "
+                         "Nyquist para ajustar un armónico")
+
+    K_valores = np.arange(1, K_max + 1)
+    semiancho = np.pi / (t[-1] - t[0])
+
+    def refinar_omega(K):
+        # Perfil de residuos con K fijo
+        resultado = minimize_scalar(
+            lambda omega: _residuos_anidados(t, y, omega, K)[2][-1],
+            bounds=(omega_inicial - semiancho, omega_inicial + semiancho),
+            method='bounded',
+            options={'xatol': 1e-10 * omega_inicial}
+        )
+        return resultado.x
+
+    def elegir_K(omega):
+        # Una sola factorización da el residuo de todos los K
+        ss_res = _residuos_anidados(t, y, omega, K_max)[2]
+        tabla = criterio_informacion(ss_res, n, 2 * K_valores + 2, criterio)
+        return int(K_valores[np.argmin(tabla)]), tabla
+
+    # Pasos 1 a 3: ω con un armónico, luego K y ω alternados
+    omega = refinar_omega(1)
+    K, tabla_criterio = elegir_K(omega)
+    if K > 1:
+        omega = refinar_omega(K)
+        K_nuevo, tabla_criterio = elegir_K(omega)
+        if K_nuevo != K:
+            K = K_nuevo
+            omega = refinar_omega(K)
+            tabla_criterio = elegir_K(omega)[1]
+
+    # Paso 4: coeficientes por sustitución hacia atrás R·coef = Q^T·y
+    c, R, ss_res_K = _residuos_anidados(t, y, omega, K)
+    coef = np.linalg.solve(R, c)
+    ss = ss_res_K[-1]
+
+    # Errores: cov = σ²·(JᵀJ)⁻¹ con J = [∂B/∂ω, X]
+    X = matriz_armonica(t, omega, K)
+    dB_domega = t * derivada_modelo_armonico(t, omega, coef) / omega
+    J = np.column_stack([dB_domega, X])
+    sigma2 = ss / (n - J.shape[1])
+    covarianza = sigma2 * np.linalg.inv(J.T @ J)
+    errores = np.sqrt(np.diag(covarianza))
+
+    ss_tot = np.sum((y - y.mean())**2)
+
+    return {
+        'omega': omega,
+        'coef': coef,
+        'K': K,
+        'errores': errores,
+        'R2': 1 - ss / ss_tot,
+        'rms': np.sqrt(ss / n),
+        'criterio': criterio,
+        'tabla_criterio': dict(zip(K_valores.tolist(), tabla_criterio.tolist())),
+    }
+
+
+# ============================================================================
+# MODELO CON EVALUACIÓN EN CACHÉ
+# ============================================================================
+
+_cache_mallas = OrderedDict()
+_bytes_cache = 0
+
+
+def _clave_malla(t):
+    """Clave hashable de una malla de tiempo (forma + resumen de su contenido)"""
+    t = np.ascontiguousarray(t, dtype=float)
+    return t.shape, hashlib.blake2b(memoryview(t).cast('B'), digest_size=16).digest()
+
+
+def _terminos_armonicos(t, omega, K, memorizar=True):
+    """
+    Matriz [1, sin(kωt), cos(kωt)] de la malla t, memorizada con una LRU
+
+    Se descartan las entradas más antiguas hasta que el total quede bajo
+    LIMITE_CACHE_BYTES. Con memorizar=False (mallas de un solo uso) la matriz
+    se calcula sin consultar ni llenar la caché. Las matrices guardadas se
+    marcan como solo lectura porque se comparten entre llamadas.
+    """
+    global _bytes_cache
+    if not memorizar:
+        return matriz_armonica(t, omega, K)
+
+    clave = (float(omega), K, _clave_malla(t))
+    X = _cache_mallas.get(clave)
+    if X is not None:
+        _cache_mallas.move_to_end(clave)
+        return X
+
+    X = matriz_armonica(t, omega, K)
+    if X.nbytes > LIMITE_CACHE_BYTES:
+        return X
+    X.flags.writeable = False
+    _cache_mallas[clave] = X
+    _bytes_cache += X.nbytes
+    while _bytes_cache > LIMITE_CACHE_BYTES:
+        _bytes_cache -= _cache_mallas.popitem(last=False)[1].nbytes
+    return X
+
+
+def limpiar_cache_mallas():
+    """Vacía la caché de términos armónicos"""
+    global _bytes_cache
+    _cache_mallas.clear()
+    _bytes_cache = 0
+
+
+class ModeloSenoidal:
+    """
+    Campo magnético ajustado B(t) = D + Σ_k [a_k·sin(kωt) + b_k·cos(kωt)]  (en mT)
+
+    omega: frecuencia angular fundamental (rad/s)
+    coef:  [D, a_1, b_1, ..., a_K, b_K]; con K = 1 equivale a A·sin(ωt + C) + D
+    """
+
+    __slots__ = ('omega', 'coef', 'K', '_coef_derivada', '_coef_integral')
+
+    def __init__(self, omega, coef):
+        self.omega = float(omega)
+        self.coef = np.asarray(coef, dtype=float)
+        self.K = (len(self.coef) - 1) // 2
+
+        k = np.arange(1, self.K + 1)
+        # d/dt: a·sin(kωt) + b·cos(kωt)  →  -b·kω·sin(kωt) + a·kω·cos(kωt)
+        self._coef_derivada = np.zeros_like(self.coef)
+        self._coef_derivada[1::2] = -k * self.omega * self.coef[2::2]
+        self._coef_derivada[2::2] = k * self.omega * self.coef[1::2]
+        # ∫dt (sin armónico constante, que aporta D·t): b/(kω)·sin(kωt) - a/(kω)·cos(kωt)
+        self._coef_integral = np.zeros_like(self.coef)
+        self._coef_integral[1::2] = self.coef[2::2] / (k * self.omega)
+        self._coef_integral[2::2] = -self.coef[1::2] / (k * self.omega)
+
+    @classmethod
+    def desde_senoidal(cls, A, omega, C, D):
+        """Modelo de un armónico a partir de B(t) = A·sin(ω·t + C) + D"""
+        return cls(omega, [D, A * np.cos(C), A * np.sin(C)])
+
+    @classmethod
+    def desde_ajuste(cls, ajuste):
+        """Modelo a partir del resultado de ajustar_modelo_armonico"""
+        return cls(ajuste['omega'], ajuste['coef'])
+
+    def __repr__(self):
+        return f"ModeloSenoidal(omega={self.omega!r}, K={self.K})"
+
+    def _terminos(self, t, memorizar=True):
+        return _terminos_armonicos(t, self.omega, self.K, memorizar)
+
+    def valor(self, t, memorizar=True):
+        """B(t) en mT"""
+        return self._terminos(t, memorizar) @ self.coef
+
+    def derivada(self, t, memorizar=True):
+        """dB/dt en mT/s"""
+        return self._terminos(t, memorizar) @ self._coef_derivada
+
+    def integral(self, t, t0=0.0):
+        """∫_{t0}^{t} B(t') dt' en mT·s"""
+        t = np.asarray(t, dtype=float)
+        primitiva_t0 = matriz_armonica(np.atleast_1d(t0), self.omega, self.K)[0] @ self._coef_integral
+        return self._terminos(t) @ self._coef_integral + self.coef[0] * (t - t0) - primitiva_t0
+
+    def corriente_faraday(self, t, N, area, R, memorizar=True):
+        """
+        Corriente inducida I(t) = ε_ind / R con ε_ind = -N·A·dB/dt
+        B está en mT, así que dB/dt se convierte a T/s (× 10⁻³). Retorna A.
+        """
+        return -N * area * self.derivada(t, memorizar) * 1e-3 / R
+
+    def amplitud(self):
+        """Amplitud A_1 = sqrt(a_1² + b_1²) de la fundamental (mT)"""
+        return np.hypot(self.coef[1], self.coef[2])
+
+    def amplitud_corriente(self, N, area, R, puntos=4096):
+        """
+        Corriente pico max|I(t)| (A)
+
+        Con K = 1 es exacta: I_pico = N·A·ω·A_1 / R (A_1 en mT → × 10⁻³).
+        Con más armónicos se muestrea un período de la fundamental, sin
+        guardar esa malla en la caché.
+        """
+        if self.K == 1:
+            return N * area * self.omega * self.amplitud() * 1e-3 / R
+        periodo = 2 * np.pi / self.omega
+        t = np.linspace(0.0, periodo, puntos, endpoint=False)
+        return np.max(np.abs(self.corriente_faraday(t, N, area, R, memorizar=False)))
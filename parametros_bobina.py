@@ -0,0 +1,12 @@
+"""
+Parámetros de la bobina y del circuito compartidos por los scripts de análisis
+(Ajustar según su laboratorio)
+Laboratorio de Física - FEM
+"""
+
+import numpy as np
+
+N = 200              # Número de vueltas de la bobina
+r_bobina = 0.025     # Radio de la bobina en metros (ejemplo: 2.5 cm)
+A_bobina = np.pi * r_bobina**2  # Área de la bobina en m²
+R = 10.0             # Resistencia total del circuito en Ohmios (Ω)
@@ -0,0 +1,120 @@
+"""
+Script para predecir la corriente inducida I(t) con un modelo RL de la bobina
+a partir del campo magnético medido B(t) (registro completo)
+
+Ley de Faraday:  ε_ind = -N·A·dB/dt
+Circuito RL:     L·dI/dt + R·I = ε_ind   →   Î(ω) = ε̂(ω) / (R + iωL)
+
+Laboratorio de Física - FEM
+"""
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend sin GUI
+import matplotlib.pyplot as plt
+
+from circuito_rl import simular_corriente_rl
+from parametros_bobina import N, r_bobina, A_bobina, R
+
+# ============================================================================
+# PARÁMETROS DEL EXPERIMENTO
+# ============================================================================
+
+# N, r_bobina, A_bobina y R (resistencia nominal): parametros_bobina.py
+f_max = 100.0        # Hz, se descarta el ruido de B por encima (f_rot ≈ 8.6 Hz)
+
+# Malla de circuitos a evaluar en un solo lote
+R_valores = np.linspace(1.0, 20.0, 39)        # Ω
+L_valores = np.linspace(0.0, 0.2, 41)         # H
+
+print("="*70)
+print("MODELO RL DE LA BOBINA: CORRIENTE PREDICHA A PARTIR DE B(t)")
+print("="*70)
+print(f"\n  N = {N} vueltas, r = {r_bobina*100:.2f} cm, A = {A_bobina:.6f} m²")
+print(f"  Malla: {len(R_valores)} valores de R × {len(L_valores)} valores de L")
+
+# ============================================================================
+# CARGAR DATOS EXPERIMENTALES (REGISTRO COMPLETO)
+# ============================================================================
+
+data = np.loadtxt('datafinal.txt', skiprows=7, delimiter='\t')
+t_all = data[:, 0]
+B_all = data[:, 1]
+I_all = data[:, 2]
+print(f"\n✓ {len(t_all)} puntos, {t_all[0]:.3f} - {t_all[-1]:.3f} s")
+
+# ============================================================================
+# SIMULACIÓN
+# ============================================================================
+
+# Circuito puramente resistivo (modelo de calcular_corriente_faraday.py)
+I_resistivo = simular_corriente_rl(t_all, B_all, N, r_bobina, R, 0.0, f_max)
+
+# Todos los pares (R, L) en una sola pasada
+R_malla, L_malla = np.meshgrid(R_valores, L_valores, indexing='ij')
+I_malla = simular_corriente_rl(t_all, B_all, N, r_bobina, R_malla, L_malla, f_max)
+
+# La polaridad de conexión de la bobina no la fija el modelo: se toma el
+# signo que mejor alinea la predicción con la medición
+I_medida = I_all - I_all.mean()
+polaridad = np.sign(np.dot(I_resistivo, I_medida))
+if polaridad == 0:
+    polaridad = 1.0
+I_resistivo *= polaridad
+I_malla *= polaridad
+
+error_rms = np.sqrt(np.mean((I_malla - I_medida)**2, axis=-1))
+i_R, i_L = np.unravel_index(np.argmin(error_rms), error_rms.shape)
+R_opt, L_opt = R_valores[i_R], L_valores[i_L]
+I_rl = I_malla[i_R, i_L]
+
+rms_medida = np.sqrt(np.mean(I_medida**2))
+rms_resistivo = np.sqrt(np.mean((I_resistivo - I_medida)**2))
+
+print("\nResultados:")
+print(f"  Polaridad de la bobina:          {polaridad:+.0f}")
+print(f"  Modelo resistivo (R = {R:.1f} Ω, L = 0):")
+print(f"    Error RMS = {rms_resistivo*1000:.4f} mA ({rms_resistivo/rms_medida*100:.1f}% de la RMS medida)")
+print(f"  Mejor par de la malla (R = {R_opt:.2f} Ω, L = {L_opt*1000:.1f} mH):")
+print(f"    Error RMS = {error_rms[i_R, i_L]*1000:.4f} mA "
+      f"({error_rms[i_R, i_L]/rms_medida*100:.1f}% de la RMS medida)")
+
+# ============================================================================
+# GRAFICAR
+# ============================================================================
+
+print("\nGenerando gráficas...")
+
+fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+
+ventana = (t_all >= 3.0) & (t_all <= 4.0)
+ax1.plot(t_all[ventana], I_medida[ventana] * 1000, 'b-', linewidth=1.5, alpha=0.7,
+         label='$I_{exp}(t)$ (sin offset)')
+ax1.plot(t_all[ventana], I_resistivo[ventana] * 1000, 'g--', linewidth=2,
+         label=f'Modelo resistivo ($R = {R:.1f}$ Ω)')
+ax1.plot(t_all[ventana], I_rl[ventana] * 1000, 'r-', linewidth=2,
+         label=f'Modelo RL ($R = {R_opt:.2f}$ Ω, $L = {L_opt*1000:.1f}$ mH)')
+ax1.set_xlabel('Tiempo (s)', fontsize=12, fontweight='bold')
+ax1.set_ylabel('Corriente (mA)', fontsize=12, fontweight='bold')
+ax1.set_title('Corriente medida y predicha por el circuito RL',
+              fontsize=14, fontweight='bold')
+ax1.grid(True, alpha=0.3, linestyle='--')
+ax1.legend(fontsize=11, loc='upper right')
+
+mapa = ax2.pcolormesh(L_valores * 1000, R_valores, error_rms * 1000, shading='auto', cmap='viridis')
+ax2.plot(L_opt * 1000, R_opt, 'r*', markersize=15)
+fig.colorbar(mapa, ax=ax2, label='Error RMS (mA)')
+ax2.set_xlabel('Inductancia L (mH)', fontsize=12, fontweight='bold')
+ax2.set_ylabel('Resistencia R (Ω)', fontsize=12, fontweight='bold')
+ax2.set_title('Error RMS de la predicción para cada par (R, L)',
+              fontsize=14, fontweight='bold')
+
+plt.tight_layout()
+
+nombre_archivo = 'corriente_rl.png'
+plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+print(f"✓ Gráfica guardada como '{nombre_archivo}'")
+
+print("\n" + "="*70)
+print("✓ PROCESO COMPLETADO")
+print("="*70)